@@ -4,16 +4,37 @@ Realistic Demo of Financial AI Swarm
 Shows real-world use cases and scenarios
 """
 
-import requests
+import asyncio
+import httpx
+import orjson
 import json
+import math
+import statistics
 import time
 from datetime import datetime
+from functools import partial, wraps
+from types import MappingProxyType
 from typing import Dict, List
 import sys
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 # API Configuration
 API_BASE_URL = "http://localhost:8000"
 
+# Shared HTTP clients - keep connections alive across scenarios and multiplex
+# concurrent requests over one connection when the server speaks HTTP/2
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=16)
+HTTP_HEADERS = {"Accept": "application/json"}
+CLIENT = httpx.Client(base_url=API_BASE_URL, http2=True, timeout=10.0, limits=HTTP_LIMITS, headers=HTTP_HEADERS)
+
+# Request bodies are pre-serialized with orjson and sent as raw bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 # Color codes for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -26,463 +47,523 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# Static message prefixes/suffixes, built once at import
+_HEADER_BAR = f"{Colors.HEADER}{Colors.BOLD}{'='*80}{Colors.ENDC}\n"
+_PFX_HEADER = f"{Colors.HEADER}{Colors.BOLD}"
+_PFX_OK = f"{Colors.OKGREEN}✓ "
+_PFX_WARN = f"{Colors.WARNING}⚠ "
+_PFX_FAIL = f"{Colors.FAIL}✗ "
+_PFX_INFO = f"{Colors.OKCYAN}ℹ "
+_SFX = f"{Colors.ENDC}\n"
+
 def print_header(text: str):
     """Print a formatted header"""
-    print(f"\n{Colors.HEADER}{Colors.BOLD}{'='*80}{Colors.ENDC}")
-    print(f"{Colors.HEADER}{Colors.BOLD}{text.center(80)}{Colors.ENDC}")
-    print(f"{Colors.HEADER}{Colors.BOLD}{'='*80}{Colors.ENDC}\n")
+    sys.stdout.write(f"\n{_HEADER_BAR}{_PFX_HEADER}{text.center(80)}{_SFX}{_HEADER_BAR}\n")
+    sys.stdout.flush()
 
 def print_success(text: str):
     """Print success message"""
-    print(f"{Colors.OKGREEN}✓ {text}{Colors.ENDC}")
+    sys.stdout.write(_PFX_OK)
+    sys.stdout.write(text)
+    sys.stdout.write(_SFX)
 
 def print_warning(text: str):
     """Print warning message"""
-    print(f"{Colors.WARNING}⚠ {text}{Colors.ENDC}")
+    sys.stdout.write(_PFX_WARN)
+    sys.stdout.write(text)
+    sys.stdout.write(_SFX)
 
 def print_error(text: str):
     """Print error message"""
-    print(f"{Colors.FAIL}✗ {text}{Colors.ENDC}")
+    sys.stdout.write(_PFX_FAIL)
+    sys.stdout.write(text)
+    sys.stdout.write(_SFX)
 
 def print_info(text: str):
     """Print info message"""
-    print(f"{Colors.OKCYAN}ℹ {text}{Colors.ENDC}")
-
-def check_api_health() -> bool:
-    """Check if API is running"""
+    sys.stdout.write(_PFX_INFO)
+    sys.stdout.write(text)
+    sys.stdout.write(_SFX)
+
+def print_lines(lines: List[str]):
+    """Print a block of lines with a single write"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def print_transaction_details(transaction: Dict):
+    """Print the standard transaction details block"""
+    print_lines([
+        f"\n{Colors.BOLD}Transaction Details:{Colors.ENDC}",
+        f"  Amount: ${transaction['amount']:,.2f}",
+        f"  Merchant: {transaction['merchant']}",
+        f"  Category: {transaction['category']}",
+        f"  Employee: {transaction['user_id']}"
+    ])
+
+# Last health probe result, reused for HEALTH_CHECK_TTL seconds
+_health_cache = {"t": float("-inf"), "ok": False}
+HEALTH_CHECK_TTL = 30
+
+def check_api_health(ttl: float = HEALTH_CHECK_TTL) -> bool:
+    """Check if API is running, reusing a recent result within ttl seconds"""
+    now = time.monotonic()
+    if now - _health_cache["t"] < ttl:
+        return _health_cache["ok"]
+
+    ok = _probe_api_health()
+    _health_cache.update(t=now, ok=ok)
+    return ok
+
+def _probe_api_health() -> bool:
+    """Probe the API /health endpoint"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = CLIENT.get("/health", timeout=5)
         if response.status_code == 200:
             print_success("API server is running and healthy")
-            data = response.json()
+            data = orjson.loads(response.content)
             print_info(f"Mode: {data.get('mode', 'unknown')}")
             print_info(f"Version: {data.get('version', 'unknown')}")
             return True
         else:
             print_error("API server is not healthy")
             return False
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print_error(f"Cannot connect to API server: {e}")
         print_info(f"Make sure the server is running: python3 standalone_api.py")
         return False
 
-def scenario_1_normal_transaction():
+async def _post(client: httpx.AsyncClient, path: str, payload, **kwargs):
+    """POST a JSON payload to the API and return the parsed JSON body"""
+    response = await client.post(path, content=orjson.dumps(payload), headers=JSON_HEADERS, **kwargs)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def _get(client: httpx.AsyncClient, path: str, **kwargs):
+    """GET from the API and return the parsed JSON body"""
+    response = await client.get(path, **kwargs)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+def scenario(fn):
+    """Report request and rendering failures of a demo scenario"""
+    title = fn.__doc__.strip()
+
+    @wraps(fn)
+    async def wrapper(client: httpx.AsyncClient):
+        try:
+            return await fn(client)
+        except httpx.HTTPStatusError as e:
+            async with _output_lock:
+                print_error(f"{title} - Request failed: {e.response.status_code}")
+        except Exception as e:
+            async with _output_lock:
+                print_error(f"{title} - Error: {e}")
+
+    return wrapper
+
+# Static scenario payloads - only the timestamp is filled in per call
+_TXN_1_BASE = MappingProxyType({
+    "transaction_id": "TXN-2025-001",
+    "amount": 450.00,
+    "merchant": "Office Depot",
+    "category": "Office Supplies",
+    "user_id": "EMP-1234",
+    "description": "Printer paper, pens, notebooks for Q1"
+})
+
+_TXN_2_BASE = MappingProxyType({
+    "transaction_id": "TXN-2025-002",
+    "amount": 45000.00,
+    "merchant": "Offshore Consulting LLC",
+    "category": "Consulting",
+    "user_id": "EMP-9999",
+    "description": "Strategic advisory services"
+})
+
+_TXN_3_BASE = MappingProxyType({
+    "transaction_id": "TXN-2025-003",
+    "amount": 2850.00,
+    "merchant": "United Airlines",
+    "category": "Travel",
+    "user_id": "EMP-5678",
+    "description": "Round-trip SFO to NYC for Q1 Sales Conference"
+})
+
+_VENDOR_TXN_BASE = MappingProxyType({
+    "merchant": "TechCorp Solutions",
+    "category": "IT Services",
+    "user_id": "EMP-1111"
+})
+_VENDOR_AMOUNTS = (5000, 7500, 8200, 6800, 9500)
+
+_DUPLICATE_CHECK_VENDORS = (
+    "Amazon Web Services",
+    "AWS Inc",
+    "Amazon AWS",
+    "Microsoft Corporation",
+    "Microsoft Corp",
+    "Google Cloud Platform",
+    "Google LLC"
+)
+
+# Scenarios print their output blocks under this lock so that concurrently
+# running scenarios never interleave. Created per run by _run_scenarios.
+_output_lock = asyncio.Lock()
+
+@scenario
+async def scenario_1_normal_transaction(client: httpx.AsyncClient):
     """Scenario 1: Normal business transaction"""
-    print_header("Scenario 1: Normal Business Transaction")
-
-    print_info("Employee purchases office supplies for the team")
-
-    transaction = {
-        "transaction_id": "TXN-2025-001",
-        "amount": 450.00,
-        "merchant": "Office Depot",
-        "category": "Office Supplies",
-        "user_id": "EMP-1234",
-        "timestamp": datetime.now().isoformat(),
-        "description": "Printer paper, pens, notebooks for Q1"
-    }
-
-    print(f"\n{Colors.BOLD}Transaction Details:{Colors.ENDC}")
-    print(f"  Amount: ${transaction['amount']:,.2f}")
-    print(f"  Merchant: {transaction['merchant']}")
-    print(f"  Category: {transaction['category']}")
-    print(f"  Employee: {transaction['user_id']}")
+    transaction = dict(_TXN_1_BASE, timestamp=datetime.now().isoformat())
 
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/process-transaction",
-            json=transaction,
-            timeout=10
-        )
+    result = await _post(client, "/api/v1/process-transaction", transaction)
 
-        if response.status_code == 200:
-            result = response.json()
+    async with _output_lock:
+        print_header("Scenario 1: Normal Business Transaction")
 
-            print(f"\n{Colors.BOLD}Analysis Results:{Colors.ENDC}")
+        print_info("Employee purchases office supplies for the team")
 
-            # Fraud Analysis
-            fraud = result.get('fraud_analysis', {})
-            risk_level = fraud.get('risk_level', 'UNKNOWN')
-            if risk_level == 'LOW':
-                print_success(f"Fraud Risk: {risk_level} (Score: {fraud.get('fraud_score', 0):.2f})")
-            elif risk_level == 'MEDIUM':
-                print_warning(f"Fraud Risk: {risk_level} (Score: {fraud.get('fraud_score', 0):.2f})")
-            else:
-                print_error(f"Fraud Risk: {risk_level} (Score: {fraud.get('fraud_score', 0):.2f})")
+        print_transaction_details(transaction)
 
-            # Compliance
-            compliance = result.get('compliance_check', {})
-            status = compliance.get('status', 'UNKNOWN')
-            if status == 'APPROVED':
-                print_success(f"Compliance: {status}")
-            else:
-                print_warning(f"Compliance: {status}")
+        print(f"\n{Colors.BOLD}Analysis Results:{Colors.ENDC}")
 
-            # Overall Status
-            overall = result.get('overall_status', 'UNKNOWN')
-            print(f"\n{Colors.BOLD}Overall Decision: {Colors.OKGREEN if overall == 'APPROVED' else Colors.WARNING}{overall}{Colors.ENDC}")
+        # Fraud Analysis
+        fraud = result.get('fraud_analysis', {})
+        risk_level = fraud.get('risk_level', 'UNKNOWN')
+        if risk_level == 'LOW':
+            print_success(f"Fraud Risk: {risk_level} (Score: {fraud.get('fraud_score', 0):.2f})")
+        elif risk_level == 'MEDIUM':
+            print_warning(f"Fraud Risk: {risk_level} (Score: {fraud.get('fraud_score', 0):.2f})")
+        else:
+            print_error(f"Fraud Risk: {risk_level} (Score: {fraud.get('fraud_score', 0):.2f})")
 
+        # Compliance
+        compliance = result.get('compliance_check', {})
+        status = compliance.get('status', 'UNKNOWN')
+        if status == 'APPROVED':
+            print_success(f"Compliance: {status}")
         else:
-            print_error(f"Request failed: {response.status_code}")
+            print_warning(f"Compliance: {status}")
 
-    except Exception as e:
-        print_error(f"Error: {e}")
+        # Overall Status
+        overall = result.get('overall_status', 'UNKNOWN')
+        print(f"\n{Colors.BOLD}Overall Decision: {Colors.OKGREEN if overall == 'APPROVED' else Colors.WARNING}{overall}{Colors.ENDC}")
 
-def scenario_2_high_risk_transaction():
+@scenario
+async def scenario_2_high_risk_transaction(client: httpx.AsyncClient):
     """Scenario 2: High-risk suspicious transaction"""
-    print_header("Scenario 2: High-Risk Suspicious Transaction")
-
-    print_warning("Large unusual payment to new vendor")
-
-    transaction = {
-        "transaction_id": "TXN-2025-002",
-        "amount": 45000.00,
-        "merchant": "Offshore Consulting LLC",
-        "category": "Consulting",
-        "user_id": "EMP-9999",
-        "timestamp": datetime.now().isoformat(),
-        "description": "Strategic advisory services"
-    }
-
-    print(f"\n{Colors.BOLD}Transaction Details:{Colors.ENDC}")
-    print(f"  Amount: ${transaction['amount']:,.2f}")
-    print(f"  Merchant: {transaction['merchant']}")
-    print(f"  Category: {transaction['category']}")
-    print(f"  Employee: {transaction['user_id']}")
+    transaction = dict(_TXN_2_BASE, timestamp=datetime.now().isoformat())
 
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/process-transaction",
-            json=transaction,
-            timeout=10
-        )
+    result = await _post(client, "/api/v1/process-transaction", transaction)
 
-        if response.status_code == 200:
-            result = response.json()
-
-            print(f"\n{Colors.BOLD}Analysis Results:{Colors.ENDC}")
-
-            # Fraud Analysis
-            fraud = result.get('fraud_analysis', {})
-            risk_level = fraud.get('risk_level', 'UNKNOWN')
-            fraud_score = fraud.get('fraud_score', 0)
-
-            if risk_level in ['HIGH', 'CRITICAL']:
-                print_error(f"Fraud Risk: {risk_level} (Score: {fraud_score:.2f})")
-                risk_factors = fraud.get('risk_factors', [])
-                if risk_factors:
-                    print(f"\n  {Colors.WARNING}Risk Factors:{Colors.ENDC}")
-                    for factor in risk_factors:
-                        print(f"    • {factor}")
-            else:
-                print_warning(f"Fraud Risk: {risk_level} (Score: {fraud_score:.2f})")
+    async with _output_lock:
+        print_header("Scenario 2: High-Risk Suspicious Transaction")
 
-            # Compliance
-            compliance = result.get('compliance_check', {})
-            status = compliance.get('status', 'UNKNOWN')
+        print_warning("Large unusual payment to new vendor")
 
-            if status == 'REJECTED':
-                print_error(f"Compliance: {status}")
-            elif status == 'REVIEW_REQUIRED':
-                print_warning(f"Compliance: {status}")
-            else:
-                print_success(f"Compliance: {status}")
-
-            violations = compliance.get('policy_violations', [])
-            if violations:
-                print(f"\n  {Colors.FAIL}Policy Violations:{Colors.ENDC}")
-                for violation in violations:
-                    print(f"    • {violation}")
-
-            # Overall Status
-            overall = result.get('overall_status', 'UNKNOWN')
-            if overall == 'REJECTED':
-                print(f"\n{Colors.BOLD}Overall Decision: {Colors.FAIL}{overall}{Colors.ENDC}")
-                print_error("❌ Transaction BLOCKED - Requires immediate review")
-            elif overall == 'FLAGGED_FOR_REVIEW':
-                print(f"\n{Colors.BOLD}Overall Decision: {Colors.WARNING}{overall}{Colors.ENDC}")
-                print_warning("⚠️  Transaction FLAGGED - Manual review required")
+        print_transaction_details(transaction)
+
+        print(f"\n{Colors.BOLD}Analysis Results:{Colors.ENDC}")
+
+        # Fraud Analysis
+        fraud = result.get('fraud_analysis', {})
+        risk_level = fraud.get('risk_level', 'UNKNOWN')
+        fraud_score = fraud.get('fraud_score', 0)
 
+        if risk_level in ['HIGH', 'CRITICAL']:
+            print_error(f"Fraud Risk: {risk_level} (Score: {fraud_score:.2f})")
+            risk_factors = fraud.get('risk_factors', [])
+            if risk_factors:
+                print(f"\n  {Colors.WARNING}Risk Factors:{Colors.ENDC}")
+                for factor in risk_factors:
+                    print(f"    • {factor}")
         else:
-            print_error(f"Request failed: {response.status_code}")
+            print_warning(f"Fraud Risk: {risk_level} (Score: {fraud_score:.2f})")
 
-    except Exception as e:
-        print_error(f"Error: {e}")
+        # Compliance
+        compliance = result.get('compliance_check', {})
+        status = compliance.get('status', 'UNKNOWN')
 
-def scenario_3_travel_expense():
+        if status == 'REJECTED':
+            print_error(f"Compliance: {status}")
+        elif status == 'REVIEW_REQUIRED':
+            print_warning(f"Compliance: {status}")
+        else:
+            print_success(f"Compliance: {status}")
+
+        violations = compliance.get('policy_violations', [])
+        if violations:
+            print(f"\n  {Colors.FAIL}Policy Violations:{Colors.ENDC}")
+            for violation in violations:
+                print(f"    • {violation}")
+
+        # Overall Status
+        overall = result.get('overall_status', 'UNKNOWN')
+        if overall == 'REJECTED':
+            print(f"\n{Colors.BOLD}Overall Decision: {Colors.FAIL}{overall}{Colors.ENDC}")
+            print_error("❌ Transaction BLOCKED - Requires immediate review")
+        elif overall == 'FLAGGED_FOR_REVIEW':
+            print(f"\n{Colors.BOLD}Overall Decision: {Colors.WARNING}{overall}{Colors.ENDC}")
+            print_warning("⚠️  Transaction FLAGGED - Manual review required")
+
+@scenario
+async def scenario_3_travel_expense(client: httpx.AsyncClient):
     """Scenario 3: Business travel expense"""
-    print_header("Scenario 3: Business Travel Expense")
-
-    print_info("Employee books flight and hotel for conference")
-
-    transaction = {
-        "transaction_id": "TXN-2025-003",
-        "amount": 2850.00,
-        "merchant": "United Airlines",
-        "category": "Travel",
-        "user_id": "EMP-5678",
-        "timestamp": datetime.now().isoformat(),
-        "description": "Round-trip SFO to NYC for Q1 Sales Conference"
-    }
-
-    print(f"\n{Colors.BOLD}Transaction Details:{Colors.ENDC}")
-    print(f"  Amount: ${transaction['amount']:,.2f}")
-    print(f"  Merchant: {transaction['merchant']}")
-    print(f"  Category: {transaction['category']}")
-    print(f"  Employee: {transaction['user_id']}")
+    transaction = dict(_TXN_3_BASE, timestamp=datetime.now().isoformat())
 
-    try:
-        # Check fraud
-        fraud_response = requests.post(
-            f"{API_BASE_URL}/api/v1/fraud-detection",
-            json=transaction,
-            timeout=10
-        )
-
-        # Check compliance
-        compliance_response = requests.post(
-            f"{API_BASE_URL}/api/v1/compliance-check",
-            json=transaction,
-            timeout=10
-        )
-
-        # Check spend analysis
-        spend_response = requests.post(
-            f"{API_BASE_URL}/api/v1/spend-analysis",
-            json=transaction,
-            timeout=10
-        )
+    # Fraud, compliance and spend checks are independent - run them concurrently
+    fraud, compliance, spend = await asyncio.gather(
+        _post(client, "/api/v1/fraud-detection", transaction),
+        _post(client, "/api/v1/compliance-check", transaction),
+        _post(client, "/api/v1/spend-analysis", transaction)
+    )
 
-        print(f"\n{Colors.BOLD}Multi-Agent Analysis:{Colors.ENDC}")
+    async with _output_lock:
+        print_header("Scenario 3: Business Travel Expense")
 
-        if fraud_response.status_code == 200:
-            fraud = fraud_response.json()
-            print_success(f"✓ Fraud Detection: {fraud.get('risk_level')} risk")
+        print_info("Employee books flight and hotel for conference")
 
-        if compliance_response.status_code == 200:
-            compliance = compliance_response.json()
-            print_success(f"✓ Compliance Check: {compliance.get('status')}")
+        print_transaction_details(transaction)
 
-        if spend_response.status_code == 200:
-            spend = spend_response.json()
-            utilization = spend.get('budget_utilization', 0)
-            budget = spend.get('budget_limit', 0)
-            print_success(f"✓ Spend Analysis: {utilization*100:.1f}% of ${budget:,.2f} budget used")
+        print(f"\n{Colors.BOLD}Multi-Agent Analysis:{Colors.ENDC}")
 
-            if spend.get('over_budget', False):
-                print_warning("  ⚠️  This transaction will exceed budget!")
-            else:
-                print_info(f"  Within budget - ${budget - (utilization * budget):,.2f} remaining")
+        print_success(f"✓ Fraud Detection: {fraud.get('risk_level')} risk")
 
-    except Exception as e:
-        print_error(f"Error: {e}")
+        print_success(f"✓ Compliance Check: {compliance.get('status')}")
 
-def scenario_4_vendor_analysis():
-    """Scenario 4: Vendor risk analysis"""
-    print_header("Scenario 4: Vendor Risk Analysis")
+        utilization = spend.get('budget_utilization', 0)
+        budget = spend.get('budget_limit', 0)
+        print_success(f"✓ Spend Analysis: {utilization*100:.1f}% of ${budget:,.2f} budget used")
 
-    print_info("Analyzing spending patterns with IT vendor")
+        if spend.get('over_budget', False):
+            print_warning("  ⚠️  This transaction will exceed budget!")
+        else:
+            print_info(f"  Within budget - ${budget - (utilization * budget):,.2f} remaining")
 
+@scenario
+async def scenario_4_vendor_analysis(client: httpx.AsyncClient):
+    """Scenario 4: Vendor risk analysis"""
+    now_iso = datetime.now().isoformat()
     transactions = [
         {
+            **_VENDOR_TXN_BASE,
             "transaction_id": f"TXN-2025-00{i}",
             "amount": amount,
-            "merchant": "TechCorp Solutions",
-            "category": "IT Services",
-            "user_id": "EMP-1111",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
-        for i, amount in enumerate([5000, 7500, 8200, 6800, 9500], start=10)
+        for i, amount in enumerate(_VENDOR_AMOUNTS, start=10)
     ]
 
-    vendor_name = "TechCorp Solutions"
-    total_spend = sum(t['amount'] for t in transactions)
-
-    print(f"\n{Colors.BOLD}Vendor Information:{Colors.ENDC}")
-    print(f"  Vendor: {vendor_name}")
-    print(f"  Transactions: {len(transactions)}")
-    print(f"  Total Spend: ${total_spend:,.2f}")
-    print(f"  Average: ${total_spend/len(transactions):,.2f}")
+    vendor_name = _VENDOR_TXN_BASE["merchant"]
+    total_spend = math.fsum(_VENDOR_AMOUNTS)
+    average_spend = statistics.fmean(_VENDOR_AMOUNTS)
 
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/vendor-analysis",
-            json={"transactions": transactions},
-            params={"vendor_name": vendor_name},
-            timeout=10
-        )
-
-        if response.status_code == 200:
-            result = response.json()
+    result = await _post(
+        client,
+        "/api/v1/vendor-analysis",
+        {"transactions": transactions},
+        params={"vendor_name": vendor_name}
+    )
 
-            print(f"\n{Colors.BOLD}Vendor Risk Assessment:{Colors.ENDC}")
+    async with _output_lock:
+        print_header("Scenario 4: Vendor Risk Analysis")
 
-            risk_level = result.get('risk_level', 'UNKNOWN')
-            risk_score = result.get('risk_score', 0)
+        print_info("Analyzing spending patterns with IT vendor")
 
-            if risk_level == 'LOW':
-                print_success(f"Risk Level: {risk_level} (Score: {risk_score:.2f})")
-            elif risk_level == 'MEDIUM':
-                print_warning(f"Risk Level: {risk_level} (Score: {risk_score:.2f})")
-            else:
-                print_error(f"Risk Level: {risk_level} (Score: {risk_score:.2f})")
+        print_lines([
+            f"\n{Colors.BOLD}Vendor Information:{Colors.ENDC}",
+            f"  Vendor: {vendor_name}",
+            f"  Transactions: {len(transactions)}",
+            f"  Total Spend: ${total_spend:,.2f}",
+            f"  Average: ${average_spend:,.2f}"
+        ])
 
-            recommendations = result.get('recommendations', [])
-            if recommendations:
-                print(f"\n{Colors.BOLD}Recommendations:{Colors.ENDC}")
-                for rec in recommendations:
-                    print(f"  • {rec}")
+        print(f"\n{Colors.BOLD}Vendor Risk Assessment:{Colors.ENDC}")
 
-    except Exception as e:
-        print_error(f"Error: {e}")
+        risk_level = result.get('risk_level', 'UNKNOWN')
+        risk_score = result.get('risk_score', 0)
 
-def scenario_5_duplicate_vendors():
+        if risk_level == 'LOW':
+            print_success(f"Risk Level: {risk_level} (Score: {risk_score:.2f})")
+        elif risk_level == 'MEDIUM':
+            print_warning(f"Risk Level: {risk_level} (Score: {risk_score:.2f})")
+        else:
+            print_error(f"Risk Level: {risk_level} (Score: {risk_score:.2f})")
+
+        recommendations = result.get('recommendations', [])
+        if recommendations:
+            print(f"\n{Colors.BOLD}Recommendations:{Colors.ENDC}")
+            for rec in recommendations:
+                print(f"  • {rec}")
+
+async def _stream_duplicate_events(response: httpx.Response):
+    """Yield (key, value) events from a vendor-duplicates response as they arrive
+
+    Top-level counters are yielded as ('total_checked', n) / ('duplicates_found', n)
+    and every duplicate pair as ('result', dict) once its object is complete.
+    """
+    if not IJSON_AVAILABLE:
+        await response.aread()
+        result = orjson.loads(response.content)
+        yield 'total_checked', result.get('total_checked', 0)
+        yield 'duplicates_found', result.get('duplicates_found', 0)
+        for dup in result.get('results', []):
+            yield 'result', dup
+        return
+
+    # Push-style parsing: feed body chunks in, drain parse events after each
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+    builder = None
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        for prefix, event, value in events:
+            if prefix in ('total_checked', 'duplicates_found'):
+                yield prefix, value
+            elif prefix == 'results.item' and event == 'start_map':
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif builder is not None:
+                builder.event(event, value)
+                if prefix == 'results.item' and event == 'end_map':
+                    yield 'result', builder.value
+                    builder = None
+        del events[:]
+    parser.close()
+
+def _render_duplicate_event(key: str, value):
+    """Print one streamed vendor-duplicates event"""
+    if key == 'total_checked':
+        print(f"\n{Colors.BOLD}Detection Results:{Colors.ENDC}")
+        print_info(f"Total vendors checked: {value}")
+    elif key == 'duplicates_found':
+        if value > 0:
+            print_warning(f"Potential duplicates found: {value}")
+            print(f"\n{Colors.BOLD}Duplicate Pairs:{Colors.ENDC}")
+        else:
+            print_success("No duplicate vendors detected")
+    elif key == 'result':
+        similarity = value.get('similarity_score', 0)
+        print_lines([
+            f"\n  {Colors.WARNING}Match found:{Colors.ENDC}",
+            f"    Vendor 1: {value.get('vendor_1')}",
+            f"    Vendor 2: {value.get('vendor_2')}",
+            f"    Similarity: {similarity*100:.1f}%",
+            f"    Action: {value.get('recommended_action')}"
+        ])
+
+@scenario
+async def scenario_5_duplicate_vendors(client: httpx.AsyncClient):
     """Scenario 5: Duplicate vendor detection"""
-    print_header("Scenario 5: Duplicate Vendor Detection")
-
-    print_info("Checking for duplicate vendor entries in the system")
-
-    vendor_names = [
-        "Amazon Web Services",
-        "AWS Inc",
-        "Amazon AWS",
-        "Microsoft Corporation",
-        "Microsoft Corp",
-        "Google Cloud Platform",
-        "Google LLC"
-    ]
-
-    print(f"\n{Colors.BOLD}Checking {len(vendor_names)} vendors:{Colors.ENDC}")
-    for vendor in vendor_names:
-        print(f"  • {vendor}")
-
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/vendor-duplicates",
-            json=vendor_names,
-            params={"threshold": 0.75},
-            timeout=10
-        )
-
-        if response.status_code == 200:
-            result = response.json()
+    vendor_names = _DUPLICATE_CHECK_VENDORS
 
-            duplicates_found = result.get('duplicates_found', 0)
+    # Results are rendered while the response streams in, so hold the
+    # output lock for the whole request
+    async with _output_lock:
+        print_header("Scenario 5: Duplicate Vendor Detection")
 
-            print(f"\n{Colors.BOLD}Detection Results:{Colors.ENDC}")
-            print_info(f"Total vendors checked: {result.get('total_checked', 0)}")
+        print_info("Checking for duplicate vendor entries in the system")
 
-            if duplicates_found > 0:
-                print_warning(f"Potential duplicates found: {duplicates_found}")
+        print_lines([f"\n{Colors.BOLD}Checking {len(vendor_names)} vendors:{Colors.ENDC}"] +
+                    [f"  • {vendor}" for vendor in vendor_names])
 
-                print(f"\n{Colors.BOLD}Duplicate Pairs:{Colors.ENDC}")
-                for dup in result.get('results', []):
-                    similarity = dup.get('similarity_score', 0)
-                    print(f"\n  {Colors.WARNING}Match found:{Colors.ENDC}")
-                    print(f"    Vendor 1: {dup.get('vendor_1')}")
-                    print(f"    Vendor 2: {dup.get('vendor_2')}")
-                    print(f"    Similarity: {similarity*100:.1f}%")
-                    print(f"    Action: {dup.get('recommended_action')}")
-            else:
-                print_success("No duplicate vendors detected")
-
-    except Exception as e:
-        print_error(f"Error: {e}")
-
-def scenario_6_system_status():
+        async with client.stream(
+            "POST",
+            "/api/v1/vendor-duplicates",
+            content=orjson.dumps(vendor_names),
+            headers=JSON_HEADERS,
+            params={"threshold": 0.75},
+            timeout=30.0
+        ) as response:
+            response.raise_for_status()
+            async for key, value in _stream_duplicate_events(response):
+                _render_duplicate_event(key, value)
+
+@scenario
+async def scenario_6_system_status(client: httpx.AsyncClient):
     """Scenario 6: System health and agent status"""
-    print_header("Scenario 6: System Health Check")
+    result = await _get(client, "/api/v1/system/status")
 
-    print_info("Checking status of all AI agents")
+    async with _output_lock:
+        print_header("Scenario 6: System Health Check")
 
-    try:
-        response = requests.get(
-            f"{API_BASE_URL}/api/v1/system/status",
-            timeout=10
-        )
+        print_info("Checking status of all AI agents")
 
-        if response.status_code == 200:
-            result = response.json()
+        print(f"\n{Colors.BOLD}System Status: {Colors.OKGREEN}{result.get('status', 'unknown').upper()}{Colors.ENDC}")
 
-            print(f"\n{Colors.BOLD}System Status: {Colors.OKGREEN}{result.get('status', 'unknown').upper()}{Colors.ENDC}")
+        agents = result.get('agents', {})
 
-            agents = result.get('agents', {})
+        print(f"\n{Colors.BOLD}Agent Status:{Colors.ENDC}")
 
-            print(f"\n{Colors.BOLD}Agent Status:{Colors.ENDC}")
+        agent_names = {
+            'fraud_detection': 'Fraud Detection Agent',
+            'compliance': 'Compliance Screening Agent',
+            'spend_analysis': 'Spend Analysis Agent',
+            'vendor_analysis': 'Vendor Analysis Agent',
+            'document_processing': 'Document Processing Agent',
+            'explanation': 'Explanation Generator Agent',
+            'learning': 'Learning & Feedback Agent'
+        }
+
+        for agent_key, agent_name in agent_names.items():
+            agent_data = agents.get(agent_key, {})
+            status = agent_data.get('status', 'unknown')
 
-            agent_names = {
-                'fraud_detection': 'Fraud Detection Agent',
-                'compliance': 'Compliance Screening Agent',
-                'spend_analysis': 'Spend Analysis Agent',
-                'vendor_analysis': 'Vendor Analysis Agent',
-                'document_processing': 'Document Processing Agent',
-                'explanation': 'Explanation Generator Agent',
-                'learning': 'Learning & Feedback Agent'
-            }
+            if status == 'active':
+                print_success(f"{agent_name}: ACTIVE")
+            elif status == 'ready':
+                print_info(f"{agent_name}: READY")
+            else:
+                print_warning(f"{agent_name}: {status.upper()}")
 
-            for agent_key, agent_name in agent_names.items():
-                agent_data = agents.get(agent_key, {})
-                status = agent_data.get('status', 'unknown')
+        print(f"\n{Colors.OKGREEN}✓ All agents operational{Colors.ENDC}")
 
-                if status == 'active':
-                    print_success(f"{agent_name}: ACTIVE")
-                elif status == 'ready':
-                    print_info(f"{agent_name}: READY")
-                else:
-                    print_warning(f"{agent_name}: {status.upper()}")
+async def _run_scenarios(*scenarios):
+    """Run scenarios concurrently over a single shared HTTP/2 client"""
+    global _output_lock
+    _output_lock = asyncio.Lock()
 
-            print(f"\n{Colors.OKGREEN}✓ All agents operational{Colors.ENDC}")
+    async with httpx.AsyncClient(
+        base_url=API_BASE_URL, http2=True, timeout=10.0, limits=HTTP_LIMITS, headers=HTTP_HEADERS
+    ) as client:
+        await asyncio.gather(*(scenario(client) for scenario in scenarios))
 
-    except Exception as e:
-        print_error(f"Error: {e}")
+def run_scenario(scenario):
+    """Run a single scenario to completion"""
+    asyncio.run(_run_scenarios(scenario))
 
 def interactive_menu():
     """Display interactive menu for demo scenarios"""
     while True:
         print_header("Financial AI Swarm - Interactive Demo")
 
-        print(f"{Colors.BOLD}Available Scenarios:{Colors.ENDC}")
-        print(f"\n  {Colors.OKCYAN}1.{Colors.ENDC} Normal Business Transaction (Office Supplies)")
-        print(f"  {Colors.WARNING}2.{Colors.ENDC} High-Risk Suspicious Transaction (Large Offshore Payment)")
-        print(f"  {Colors.OKBLUE}3.{Colors.ENDC} Business Travel Expense (Flight Booking)")
-        print(f"  {Colors.OKCYAN}4.{Colors.ENDC} Vendor Risk Analysis (IT Services)")
-        print(f"  {Colors.WARNING}5.{Colors.ENDC} Duplicate Vendor Detection")
-        print(f"  {Colors.OKGREEN}6.{Colors.ENDC} System Health Check")
-        print(f"\n  {Colors.BOLD}7.{Colors.ENDC} Run All Scenarios")
-        print(f"  {Colors.BOLD}0.{Colors.ENDC} Exit")
+        print_lines([
+            f"{Colors.BOLD}Available Scenarios:{Colors.ENDC}",
+            f"\n  {Colors.OKCYAN}1.{Colors.ENDC} Normal Business Transaction (Office Supplies)",
+            f"  {Colors.WARNING}2.{Colors.ENDC} High-Risk Suspicious Transaction (Large Offshore Payment)",
+            f"  {Colors.OKBLUE}3.{Colors.ENDC} Business Travel Expense (Flight Booking)",
+            f"  {Colors.OKCYAN}4.{Colors.ENDC} Vendor Risk Analysis (IT Services)",
+            f"  {Colors.WARNING}5.{Colors.ENDC} Duplicate Vendor Detection",
+            f"  {Colors.OKGREEN}6.{Colors.ENDC} System Health Check",
+            f"\n  {Colors.BOLD}7.{Colors.ENDC} Run All Scenarios",
+            f"  {Colors.BOLD}0.{Colors.ENDC} Exit"
+        ])
 
         choice = input(f"\n{Colors.BOLD}Select scenario (0-7): {Colors.ENDC}").strip()
 
         if choice == '0':
             print_success("Thank you for using Financial AI Swarm Demo!")
             break
-        elif choice == '1':
-            scenario_1_normal_transaction()
-            input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
-        elif choice == '2':
-            scenario_2_high_risk_transaction()
-            input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
-        elif choice == '3':
-            scenario_3_travel_expense()
-            input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
-        elif choice == '4':
-            scenario_4_vendor_analysis()
-            input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
-        elif choice == '5':
-            scenario_5_duplicate_vendors()
-            input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
-        elif choice == '6':
-            scenario_6_system_status()
-            input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
-        elif choice == '7':
-            run_all_scenarios()
-            input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
-        else:
+
+        action = DISPATCH.get(choice)
+        if action is None:
             print_error("Invalid choice. Please select 0-7.")
             time.sleep(1)
+            continue
+
+        action()
+        input(f"\n{Colors.BOLD}Press Enter to continue...{Colors.ENDC}")
 
 def run_all_scenarios():
-    """Run all demo scenarios"""
+    """Run all demo scenarios concurrently"""
     scenarios = [
         scenario_1_normal_transaction,
         scenario_2_high_risk_transaction,
@@ -492,10 +573,18 @@ def run_all_scenarios():
         scenario_6_system_status
     ]
 
-    for i, scenario in enumerate(scenarios, 1):
-        scenario()
-        if i < len(scenarios):
-            time.sleep(2)
+    asyncio.run(_run_scenarios(*scenarios))
+
+# Menu choice -> action
+DISPATCH = {
+    '1': partial(run_scenario, scenario_1_normal_transaction),
+    '2': partial(run_scenario, scenario_2_high_risk_transaction),
+    '3': partial(run_scenario, scenario_3_travel_expense),
+    '4': partial(run_scenario, scenario_4_vendor_analysis),
+    '5': partial(run_scenario, scenario_5_duplicate_vendors),
+    '6': partial(run_scenario, scenario_6_system_status),
+    '7': run_all_scenarios
+}
 
 def main():
     """Main entry point"""
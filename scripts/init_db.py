@@ -4,9 +4,11 @@ Initialize Database and Download Models
 Sets up the system for first use
 """
 
+import argparse
 import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
@@ -31,9 +33,8 @@ def create_directories():
     ]
     
     for directory in directories:
-        path = Path(directory)
-        path.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Created directory: {directory}")
+        os.makedirs(directory, exist_ok=True)
+    logger.info("Created directories: %s", ", ".join(directories))
 
 
 def download_models():
@@ -41,10 +42,18 @@ def download_models():
     logger.info("Downloading embedding models...")
     
     try:
-        from sentence_transformers import SentenceTransformer
+        from huggingface_hub import try_to_load_from_cache
         
         # Download embedding model for RAG
         model_name = 'all-MiniLM-L6-v2'
+        
+        # Skip the full model load when the snapshot is already cached locally
+        if isinstance(try_to_load_from_cache(f'sentence-transformers/{model_name}', 'config.json'), str):
+            logger.info(f"✓ {model_name} is already cached, skipping download")
+            return
+        
+        from sentence_transformers import SentenceTransformer
+        
         logger.info(f"Downloading {model_name}...")
         model = SentenceTransformer(model_name)
         logger.info(f"✓ Successfully downloaded {model_name}")
@@ -54,37 +63,59 @@ def download_models():
         logger.info("Models will be downloaded on first use")
 
 
+def quantize_embedding_model():
+    """Export an int8 ONNX copy of the embedding model for faster CPU inference"""
+    try:
+        from agents.compliance.agent import ComplianceAgent, QuantizedSentenceEncoder
+        
+        output_dir = ComplianceAgent.QUANTIZED_MODEL_DIR
+        if os.path.exists(os.path.join(output_dir, QuantizedSentenceEncoder.MODEL_FILE)):
+            logger.info(f"✓ Quantized embedding model already exported: {output_dir}")
+            return
+        
+        logger.info("Exporting int8 ONNX embedding model...")
+        QuantizedSentenceEncoder.export(output_dir)
+        logger.info(f"✓ Exported quantized embedding model: {output_dir}")
+        
+    except Exception as e:
+        logger.warning(f"Could not export quantized embedding model: {e}")
+        logger.info("The FP32 SentenceTransformer model will be used")
+
+
 def create_mock_data():
     """Create mock transaction data for testing"""
     import pandas as pd
     import numpy as np
-    from datetime import datetime, timedelta
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from datetime import datetime
     
     logger.info("Creating mock transaction data...")
     
-    # Generate mock transactions
+    # Generate mock transactions (columnar draws, no per-row Python loop)
     num_transactions = 1000
     categories = ['Travel', 'IT Services', 'Entertainment', 'Consulting', 'Supplies']
     merchants = ['Vendor A', 'Vendor B', 'Vendor C', 'Hotel Chain', 'Tech Corp']
+    locations = ['New York', 'San Francisco', 'Chicago', 'Remote']
     
-    transactions = []
-    for i in range(num_transactions):
-        date = datetime.now() - timedelta(days=np.random.randint(0, 365))
-        
-        transactions.append({
-            'transaction_id': f'TXN-{i:05d}',
-            'amount': np.random.lognormal(6, 1.5),  # Log-normal distribution
-            'merchant': np.random.choice(merchants),
-            'category': np.random.choice(categories),
-            'user_id': f'EMP-{np.random.randint(1, 100):03d}',
-            'timestamp': date.isoformat(),
-            'location': np.random.choice(['New York', 'San Francisco', 'Chicago', 'Remote']),
-            'description': f'Business expense {i}'
-        })
-    
-    df = pd.DataFrame(transactions)
-    output_path = 'data/mock/transactions.csv'
-    df.to_csv(output_path, index=False)
+    rng = np.random.default_rng()
+    days_ago = rng.integers(0, 365, size=num_transactions).astype('timedelta64[D]')
+    timestamps = np.datetime64(datetime.now(), 'us') - days_ago
+    employee_numbers = rng.integers(1, 100, size=num_transactions).astype(str)
+    
+    df = pd.DataFrame({
+        'transaction_id': [f'TXN-{i:05d}' for i in range(num_transactions)],
+        'amount': rng.lognormal(6, 1.5, size=num_transactions),  # Log-normal distribution
+        'merchant': rng.choice(merchants, size=num_transactions),
+        'category': rng.choice(categories, size=num_transactions),
+        'user_id': np.char.add('EMP-', np.char.zfill(employee_numbers, 3)),
+        'timestamp': np.datetime_as_string(timestamps),
+        'location': rng.choice(locations, size=num_transactions),
+        'description': [f'Business expense {i}' for i in range(num_transactions)]
+    })
+    output_path = 'data/mock/transactions.parquet'
+    os.makedirs('data/mock', exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), output_path, compression='zstd')
     logger.info(f"✓ Created {num_transactions} mock transactions: {output_path}")
     
     return df
@@ -110,9 +141,7 @@ def create_mock_policies():
     output_path = 'data/policies/company_policies.txt'
     os.makedirs('data/policies', exist_ok=True)
     
-    with open(output_path, 'w') as f:
-        for policy in policies:
-            f.write(policy + '\n\n')
+    Path(output_path).write_text("\n\n".join(policies) + "\n\n", encoding="utf-8")
     
     logger.info(f"✓ Created policy documents: {output_path}")
 
@@ -128,7 +157,7 @@ def initialize_fraud_models():
         
         # Load mock data for training
         import pandas as pd
-        df = pd.read_csv('data/mock/transactions.csv')
+        df = pd.read_parquet('data/mock/transactions.parquet')
         
         # Extract features for training (simplified)
         logger.info("Pre-training fraud models with mock data...")
@@ -154,47 +183,88 @@ def test_api_connection():
         ('streamlit', 'Streamlit')
     ]
     
-    all_available = True
-    for module, name in dependencies:
+    def _probe(module):
         try:
             __import__(module)
-            logger.info(f"✓ {name} is available")
+            return True
         except ImportError:
+            return False
+    
+    # Imports spend most of their time in file IO and extension loading,
+    # so probing them from threads overlaps that work
+    with ThreadPoolExecutor(max_workers=len(dependencies)) as executor:
+        results = list(executor.map(_probe, [module for module, _ in dependencies]))
+    
+    all_available = True
+    for (module, name), available in zip(dependencies, results):
+        if available:
+            logger.info(f"✓ {name} is available")
+        else:
             logger.error(f"✗ {name} is NOT available - run: pip install {module}")
             all_available = False
     
     return all_available
 
 
+STEPS = ['deps', 'dirs', 'models', 'data', 'fraud']
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Initialize Financial AI Swarm")
+    parser.add_argument(
+        '--steps',
+        default=','.join(STEPS),
+        help=f"Comma-separated steps to run (default: all). Choices: {', '.join(STEPS)}"
+    )
+    args = parser.parse_args()
+    
+    steps = {step.strip() for step in args.steps.split(',') if step.strip()}
+    unknown = steps - set(STEPS)
+    if unknown:
+        parser.error(f"Unknown steps: {', '.join(sorted(unknown))}")
+    
+    return steps
+
+
 def main():
     """Main initialization routine"""
+    # Heavy imports live inside each step, so skipped steps never load them
+    steps = parse_args()
+    
     logger.info("=" * 60)
     logger.info("Financial AI Swarm - Initialization Script")
     logger.info("=" * 60)
     
     # Check dependencies
-    logger.info("\n[1/6] Checking dependencies...")
-    if not test_api_connection():
-        logger.error("Some dependencies are missing. Please install requirements:")
-        logger.error("pip install -r requirements.txt")
-        return
+    if 'deps' in steps:
+        logger.info("\n[1/6] Checking dependencies...")
+        if not test_api_connection():
+            logger.error("Some dependencies are missing. Please install requirements:")
+            logger.error("pip install -r requirements.txt")
+            return
     
     # Create directories
-    logger.info("\n[2/6] Creating directories...")
-    create_directories()
+    if 'dirs' in steps:
+        logger.info("\n[2/6] Creating directories...")
+        create_directories()
     
     # Download models
-    logger.info("\n[3/6] Downloading models...")
-    download_models()
+    if 'models' in steps:
+        logger.info("\n[3/6] Downloading models...")
+        download_models()
+        quantize_embedding_model()
     
     # Create mock data
-    logger.info("\n[4/6] Creating mock data...")
-    create_mock_data()
-    create_mock_policies()
+    if 'data' in steps:
+        logger.info("\n[4/6] Creating mock data...")
+        create_mock_data()
+        create_mock_policies()
     
     # Initialize models
-    logger.info("\n[5/6] Initializing fraud models...")
-    initialize_fraud_models()
+    if 'fraud' in steps:
+        logger.info("\n[5/6] Initializing fraud models...")
+        initialize_fraud_models()
     
     # Final checks
     logger.info("\n[6/6] Running final checks...")
@@ -5,12 +5,23 @@ Demonstrates all capabilities of the Financial AI Swarm
 """
 
 import sys
+import argparse
+import asyncio
 import logging
 from pathlib import Path
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 import json
+import numpy as np
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
@@ -23,6 +34,23 @@ logger = logging.getLogger(__name__)
 
 API_BASE_URL = "http://localhost:8000"
 
+# (connect, read) timeouts: fail fast on an unreachable server, allow slow model inference
+REQUEST_TIMEOUT = (3, 30)
+
+# Shared keep-alive session so sequential demo calls reuse one pooled connection,
+# with bounded retries on gateway errors (demo calls are read-only analyses)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"})
+    )
+))
+
 
 def print_section(title):
     """Print a formatted section header"""
@@ -34,7 +62,7 @@ def print_section(title):
 def check_api_health():
     """Check if API is running"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = SESSION.get(f"{API_BASE_URL}/health", timeout=(3, 5))
         if response.status_code == 200:
             logger.info("✓ API server is healthy")
             return True
@@ -44,12 +72,44 @@ def check_api_health():
         return False
 
 
-def demo_fraud_detection():
-    """Demo Scenario 1: Fraud Detection"""
-    print_section("DEMO 1: Fraud Detection - High-Risk Transaction")
+def _request(method, path, payload=None, timeout=REQUEST_TIMEOUT):
+    """Send a request over the shared session and return the JSON body, or None on failure"""
+    try:
+        response = SESSION.request(method, f"{API_BASE_URL}{path}", json=payload, timeout=timeout)
+        
+        if response.status_code == 200:
+            return response.json()
+        logger.error(f"API error: {response.status_code}")
+        
+    except Exception as e:
+        logger.error(f"Demo failed: {e}")
+    
+    return None
+
+
+async def _request_async(session, method, path, payload=None, timeout=REQUEST_TIMEOUT):
+    """aiohttp counterpart of _request"""
+    connect_timeout, read_timeout = timeout
+    try:
+        async with session.request(
+            method,
+            f"{API_BASE_URL}{path}",
+            json=payload,
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            logger.error(f"API error: {response.status}")
+            
+    except Exception as e:
+        logger.error(f"Demo failed: {e}")
     
+    return None
+
+
+def _fraud_demo_transaction():
     # Suspicious transaction
-    transaction = {
+    return {
         "transaction_id": "DEMO-FRAUD-001",
         "amount": 25000.00,
         "merchant": "Unknown Electronics Store",
@@ -58,6 +118,10 @@ def demo_fraud_detection():
         "timestamp": "2025-01-15T02:30:00Z",
         "location": "Unknown Location"
     }
+
+
+def _render_fraud_detection(transaction, result):
+    print_section("DEMO 1: Fraud Detection - High-Risk Transaction")
     
     print(f"Processing suspicious transaction:")
     print(f"  Amount: ${transaction['amount']:,.2f}")
@@ -65,42 +129,39 @@ def demo_fraud_detection():
     print(f"  Time: {transaction['timestamp']}")
     print(f"  Location: {transaction['location']}")
     
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/fraud-detection",
-            json=transaction,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            
-            print(f"\n🔍 Fraud Analysis Results:")
-            print(f"  Risk Level: {result['risk_level']}")
-            print(f"  Fraud Score: {result['fraud_score']:.3f}")
-            print(f"  Confidence: {result['confidence']:.2%}")
-            
-            if result['risk_factors']:
-                print(f"\n  Risk Factors:")
-                for factor in result['risk_factors']:
-                    print(f"    ⚠️  {factor}")
-            
-            return result
-        else:
-            logger.error(f"API error: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Demo failed: {e}")
+    if result is None:
         return None
+    
+    print(f"\n🔍 Fraud Analysis Results:")
+    print(f"  Risk Level: {result['risk_level']}")
+    print(f"  Fraud Score: {result['fraud_score']:.3f}")
+    print(f"  Confidence: {result['confidence']:.2%}")
+    
+    if result['risk_factors']:
+        print(f"\n  Risk Factors:")
+        for factor in result['risk_factors']:
+            print(f"    ⚠️  {factor}")
+    
+    return result
 
 
-def demo_compliance_check():
-    """Demo Scenario 2: Compliance Screening"""
-    print_section("DEMO 2: Compliance Check - Sanctions Screening")
-    
+def demo_fraud_detection():
+    """Demo Scenario 1: Fraud Detection"""
+    transaction = _fraud_demo_transaction()
+    result = _request("POST", "/api/v1/fraud-detection", transaction)
+    return _render_fraud_detection(transaction, result)
+
+
+async def demo_fraud_detection_async(session):
+    """Demo Scenario 1: Fraud Detection"""
+    transaction = _fraud_demo_transaction()
+    result = await _request_async(session, "POST", "/api/v1/fraud-detection", transaction)
+    return _render_fraud_detection(transaction, result)
+
+
+def _compliance_demo_transaction():
     # Transaction with sanctioned vendor
-    transaction = {
+    return {
         "transaction_id": "DEMO-COMPLIANCE-001",
         "amount": 50000.00,
         "merchant": "Suspicious Corp International",
@@ -109,45 +170,56 @@ def demo_compliance_check():
         "timestamp": datetime.now().isoformat(),
         "merchant_description": "Consulting services from overseas vendor"
     }
+
+
+def _compliance_demo_transactions():
+    # Screen every demo transaction in one batched request
+    return [_compliance_demo_transaction(), _fraud_demo_transaction(), _full_demo_transaction()]
+
+
+def _render_compliance_check(transactions, response):
+    print_section("DEMO 2: Compliance Check - Sanctions Screening")
     
-    print(f"Checking transaction against sanctions lists:")
-    print(f"  Merchant: {transaction['merchant']}")
-    print(f"  Amount: ${transaction['amount']:,.2f}")
+    print(f"Checking {len(transactions)} transactions against sanctions lists in one batch")
     
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/compliance-check",
-            json=transaction,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            
-            print(f"\n✓ Compliance Results:")
-            print(f"  Status: {result['status']}")
-            print(f"  Sanctions Hit: {'YES ⚠️' if result['sanctions_hit'] else 'NO ✓'}")
-            print(f"  PEP Hit: {'YES ⚠️' if result['pep_hit'] else 'NO ✓'}")
-            print(f"  Risk Score: {result['risk_score']:.2f}")
-            
-            if result['policy_violations']:
-                print(f"\n  Policy Violations:")
-                for violation in result['policy_violations']:
-                    print(f"    ❌ {violation}")
-            
-            if result['recommendations']:
-                print(f"\n  Recommendations:")
-                for rec in result['recommendations']:
-                    print(f"    → {rec}")
-            
-            return result
-        else:
-            logger.error(f"API error: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Demo failed: {e}")
+    if response is None:
         return None
+    
+    for transaction, result in zip(transactions, response['results']):
+        print(f"\n  Merchant: {transaction['merchant']}")
+        print(f"  Amount: ${transaction['amount']:,.2f}")
+        
+        print(f"\n✓ Compliance Results:")
+        print(f"  Status: {result['status']}")
+        print(f"  Sanctions Hit: {'YES ⚠️' if result['sanctions_hit'] else 'NO ✓'}")
+        print(f"  PEP Hit: {'YES ⚠️' if result['pep_hit'] else 'NO ✓'}")
+        print(f"  Risk Score: {result['risk_score']:.2f}")
+        
+        if result['policy_violations']:
+            print(f"\n  Policy Violations:")
+            for violation in result['policy_violations']:
+                print(f"    ❌ {violation}")
+        
+        if result['recommendations']:
+            print(f"\n  Recommendations:")
+            for rec in result['recommendations']:
+                print(f"    → {rec}")
+    
+    return response
+
+
+def demo_compliance_check():
+    """Demo Scenario 2: Compliance Screening"""
+    transactions = _compliance_demo_transactions()
+    response = _request("POST", "/api/v1/compliance-check/batch", {"transactions": transactions})
+    return _render_compliance_check(transactions, response)
+
+
+async def demo_compliance_check_async(session):
+    """Demo Scenario 2: Compliance Screening"""
+    transactions = _compliance_demo_transactions()
+    response = await _request_async(session, "POST", "/api/v1/compliance-check/batch", {"transactions": transactions})
+    return _render_compliance_check(transactions, response)
 
 
 def demo_document_processing():
@@ -177,68 +249,77 @@ def demo_document_processing():
     print(f"    3x Soft Drinks         $9.00")
 
 
-def demo_spend_analysis():
-    """Demo Scenario 4: Spend Analysis"""
-    print_section("DEMO 4: Spend Analysis - Budget Monitoring")
-    
-    # Generate sample transactions
-    import random
-    
-    transactions = []
+async def demo_document_processing_async(session):
+    """Demo Scenario 3: Document Processing (no API call)"""
+    return demo_document_processing()
+
+
+def _spend_demo_transactions(n=30):
+    # Generate sample transactions, drawing each field for all rows at once
+    rng = np.random.default_rng()
     categories = ["IT Services", "Travel", "Entertainment", "Consulting"]
     
-    for i in range(30):
-        transactions.append({
+    amounts = rng.uniform(100, 5000, n).tolist()
+    vendors = rng.integers(1, 11, n).tolist()
+    users = rng.integers(1, 21, n).tolist()
+    category_idx = rng.integers(0, len(categories), n).tolist()
+    timestamp = datetime.now().isoformat()
+    
+    return [
+        {
             "transaction_id": f"DEMO-SPEND-{i:03d}",
-            "amount": random.uniform(100, 5000),
-            "merchant": f"Vendor {random.randint(1, 10)}",
-            "category": random.choice(categories),
-            "user_id": f"EMP-{random.randint(1, 20):03d}",
-            "timestamp": datetime.now().isoformat()
-        })
+            "amount": amount,
+            "merchant": f"Vendor {vendor}",
+            "category": categories[cat],
+            "user_id": f"EMP-{user:03d}",
+            "timestamp": timestamp
+        }
+        for i, (amount, vendor, user, cat) in enumerate(zip(amounts, vendors, users, category_idx))
+    ]
+
+
+def _render_spend_analysis(transactions, result):
+    print_section("DEMO 4: Spend Analysis - Budget Monitoring")
     
     print(f"Analyzing {len(transactions)} transactions...")
     
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/spend-analysis",
-            json={"transactions": transactions},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            
-            print(f"\n💰 Spend Analysis Results:")
-            print(f"  Total Spend: ${result['total_spend']:,.2f}")
-            print(f"  Budget Utilization: {result['budget_utilization']:.1%}")
-            print(f"  Anomalies Detected: {len(result['anomalies'])}")
-            
-            print(f"\n  Category Breakdown:")
-            for category, amount in result['category_breakdown'].items():
-                print(f"    {category}: ${amount:,.2f}")
-            
-            if result['recommendations']:
-                print(f"\n  Recommendations:")
-                for rec in result['recommendations'][:3]:
-                    print(f"    💡 {rec}")
-            
-            return result
-        else:
-            logger.error(f"API error: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Demo failed: {e}")
+    if result is None:
         return None
+    
+    print(f"\n💰 Spend Analysis Results:")
+    print(f"  Total Spend: ${result['total_spend']:,.2f}")
+    print(f"  Budget Utilization: {result['budget_utilization']:.1%}")
+    print(f"  Anomalies Detected: {len(result['anomalies'])}")
+    
+    print(f"\n  Category Breakdown:")
+    for category, amount in result['category_breakdown'].items():
+        print(f"    {category}: ${amount:,.2f}")
+    
+    if result['recommendations']:
+        print(f"\n  Recommendations:")
+        for rec in result['recommendations'][:3]:
+            print(f"    💡 {rec}")
+    
+    return result
 
 
-def demo_full_transaction():
-    """Demo Scenario 5: Full Transaction Processing"""
-    print_section("DEMO 5: Complete Transaction Flow")
-    
+def demo_spend_analysis():
+    """Demo Scenario 4: Spend Analysis"""
+    transactions = _spend_demo_transactions()
+    result = _request("POST", "/api/v1/spend-analysis", {"transactions": transactions})
+    return _render_spend_analysis(transactions, result)
+
+
+async def demo_spend_analysis_async(session):
+    """Demo Scenario 4: Spend Analysis"""
+    transactions = _spend_demo_transactions()
+    result = await _request_async(session, "POST", "/api/v1/spend-analysis", {"transactions": transactions})
+    return _render_spend_analysis(transactions, result)
+
+
+def _full_demo_transaction():
     # Normal transaction
-    transaction = {
+    return {
         "transaction_id": "DEMO-FULL-001",
         "amount": 1500.00,
         "merchant": "Tech Vendor Inc",
@@ -248,6 +329,10 @@ def demo_full_transaction():
         "location": "New York, NY",
         "description": "Software licenses"
     }
+
+
+def _render_full_transaction(transaction, result):
+    print_section("DEMO 5: Complete Transaction Flow")
     
     print(f"Processing complete transaction through all agents:")
     print(f"  Transaction: {transaction['transaction_id']}")
@@ -256,95 +341,87 @@ def demo_full_transaction():
     
     print(f"\n⏳ Running through agent pipeline...")
     
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/process-transaction",
-            json=transaction,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            
-            print(f"\n✨ Complete Analysis Results:")
-            print(f"\n  Overall Status: {result['overall_status']}")
-            
-            print(f"\n  🔍 Fraud Analysis:")
-            fraud = result['fraud_analysis']
-            print(f"    Risk Level: {fraud['risk_level']}")
-            print(f"    Fraud Score: {fraud['score']:.3f}")
-            
-            print(f"\n  ✓ Compliance Check:")
-            compliance = result['compliance_check']
-            print(f"    Status: {compliance['status']}")
-            print(f"    Sanctions: {'HIT' if compliance['sanctions_hit'] else 'CLEAR'}")
-            
-            print(f"\n  💰 Spend Impact:")
-            spend = result['spend_analysis']
-            print(f"    Budget Utilization: {spend['budget_utilization']:.1%}")
-            
-            return result
-        else:
-            logger.error(f"API error: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Demo failed: {e}")
+    if result is None:
         return None
+    
+    print(f"\n✨ Complete Analysis Results:")
+    print(f"\n  Overall Status: {result['overall_status']}")
+    
+    print(f"\n  🔍 Fraud Analysis:")
+    fraud = result['fraud_analysis']
+    print(f"    Risk Level: {fraud['risk_level']}")
+    print(f"    Fraud Score: {fraud['score']:.3f}")
+    
+    print(f"\n  ✓ Compliance Check:")
+    compliance = result['compliance_check']
+    print(f"    Status: {compliance['status']}")
+    print(f"    Sanctions: {'HIT' if compliance['sanctions_hit'] else 'CLEAR'}")
+    
+    print(f"\n  💰 Spend Impact:")
+    spend = result['spend_analysis']
+    print(f"    Budget Utilization: {spend['budget_utilization']:.1%}")
+    
+    return result
 
 
-def demo_system_status():
-    """Show system status"""
+def demo_full_transaction():
+    """Demo Scenario 5: Full Transaction Processing"""
+    transaction = _full_demo_transaction()
+    result = _request("POST", "/api/v1/process-transaction", transaction)
+    return _render_full_transaction(transaction, result)
+
+
+async def demo_full_transaction_async(session):
+    """Demo Scenario 5: Full Transaction Processing"""
+    transaction = _full_demo_transaction()
+    result = await _request_async(session, "POST", "/api/v1/process-transaction", transaction)
+    return _render_full_transaction(transaction, result)
+
+
+def _render_system_status(result):
     print_section("System Status Check")
     
-    try:
-        response = requests.get(f"{API_BASE_URL}/api/v1/system/status", timeout=10)
-        
-        if response.status_code == 200:
-            result = response.json()
-            
-            print(f"✓ System Status: {result['status'].upper()}")
-            print(f"\nActive Agents:")
-            
-            for agent_name, agent_info in result['agents'].items():
-                status_emoji = "✓" if agent_info['status'] == 'active' else "✗"
-                print(f"  {status_emoji} {agent_name.replace('_', ' ').title()}: {agent_info['status']}")
-            
-            return result
-        else:
-            logger.error(f"API error: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Demo failed: {e}")
+    if result is None:
         return None
-
-
-def main():
-    """Run all demo scenarios"""
-    print("\n" + "=" * 70)
-    print("  FINANCIAL AI SWARM - COMPREHENSIVE DEMO")
-    print("=" * 70)
     
-    # Check API health
-    if not check_api_health():
-        return
+    print(f"✓ System Status: {result['status'].upper()}")
+    print(f"\nActive Agents:")
+    
+    for agent_name, agent_info in result['agents'].items():
+        status_emoji = "✓" if agent_info['status'] == 'active' else "✗"
+        print(f"  {status_emoji} {agent_name.replace('_', ' ').title()}: {agent_info['status']}")
     
+    return result
+
+
+def demo_system_status():
+    """Show system status"""
+    return _render_system_status(_request("GET", "/api/v1/system/status", timeout=(3, 10)))
+
+
+async def demo_system_status_async(session):
+    """Show system status"""
+    return _render_system_status(await _request_async(session, "GET", "/api/v1/system/status", timeout=(3, 10)))
+
+
+# (name, sync demo, async demo)
+DEMOS = [
+    ("Fraud Detection", demo_fraud_detection, demo_fraud_detection_async),
+    ("Compliance Check", demo_compliance_check, demo_compliance_check_async),
+    ("Document Processing", demo_document_processing, demo_document_processing_async),
+    ("Spend Analysis", demo_spend_analysis, demo_spend_analysis_async),
+    ("Full Transaction Flow", demo_full_transaction, demo_full_transaction_async)
+]
+
+
+def run_all_sync():
+    """Run the status check and demo scenarios one after another"""
     # Show system status
     demo_system_status()
     
     time.sleep(2)
     
-    # Run demo scenarios
-    demos = [
-        ("Fraud Detection", demo_fraud_detection),
-        ("Compliance Check", demo_compliance_check),
-        ("Document Processing", demo_document_processing),
-        ("Spend Analysis", demo_spend_analysis),
-        ("Full Transaction Flow", demo_full_transaction)
-    ]
-    
-    for name, demo_func in demos:
+    for name, demo_func, _ in DEMOS:
         try:
             demo_func()
             time.sleep(2)
@@ -354,6 +431,56 @@ def main():
         except Exception as e:
             logger.error(f"Demo '{name}' failed: {e}")
             continue
+
+
+async def run_all():
+    """Run the status check and all demo scenarios concurrently over one aiohttp session"""
+    connector = aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        demos = [demo_system_status_async(session)]
+        demos.extend(demo_async(session) for _, _, demo_async in DEMOS)
+        
+        results = await asyncio.gather(*demos, return_exceptions=True)
+    
+    for (name, _, _), result in zip(DEMOS, results[1:]):
+        if isinstance(result, Exception):
+            logger.error(f"Demo '{name}' failed: {result}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the Financial AI Swarm demo scenarios")
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run all scenarios concurrently with aiohttp"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Run all demo scenarios"""
+    args = parse_args()
+    
+    print("\n" + "=" * 70)
+    print("  FINANCIAL AI SWARM - COMPREHENSIVE DEMO")
+    print("=" * 70)
+    
+    # Check API health
+    if not check_api_health():
+        return
+    
+    if args.use_async and not AIOHTTP_AVAILABLE:
+        logger.warning("aiohttp not installed, running demos sequentially")
+        args.use_async = False
+    
+    try:
+        if args.use_async:
+            asyncio.run(run_all())
+        else:
+            run_all_sync()
+    except KeyboardInterrupt:
+        print("\n\nDemo interrupted by user")
     
     # Final summary
     print_section("DEMO COMPLETE")
@@ -3,21 +3,65 @@ Compliance Agent
 OFAC/PEP screening and policy RAG implementation
 """
 
+import bisect
+import functools
+import hashlib
 import logging
-from typing import Dict, List, Optional, Set
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
 from dataclasses import dataclass
 from datetime import datetime
-import re
-import hashlib
 
-# Vector database for policy RAG
-from sentence_transformers import SentenceTransformer
+# SentenceTransformer and faiss are imported where first used, so importing
+# this module (e.g. for ComplianceResult) doesn't pull in torch/transformers
 import numpy as np
-import faiss
+
+# Multi-pattern matcher for sanctions/PEP screening
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logging.warning("pyahocorasick not available, sanctions screening will use linear scans")
+
+# JIT compilation of the policy rule kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logging.warning("numba not available, policy rules will be evaluated with NumPy")
 
 logger = logging.getLogger(__name__)
 
 
+def _violations_mask_numpy(amount: float, category_bits: int, flags: int, thresholds: np.ndarray,
+                           category_mask: np.ndarray, flag_requirement: np.ndarray) -> np.ndarray:
+    """
+    Evaluate every policy rule against one transaction
+    
+    A rule is violated when the amount exceeds its threshold, the transaction
+    has all of the rule's category bits, and none of its required flags.
+    """
+    return (amount > thresholds) & ((category_mask & ~category_bits) == 0) & ((flags & flag_requirement) == 0)
+
+
+def _violations_mask_loop(amount, category_bits, flags, thresholds, category_mask, flag_requirement):
+    violated = np.zeros(thresholds.shape[0], dtype=np.bool_)
+    for r in range(thresholds.shape[0]):
+        violated[r] = (
+            amount > thresholds[r]
+            and (category_mask[r] & ~category_bits) == 0
+            and (flags & flag_requirement[r]) == 0
+        )
+    return violated
+
+
+_violations_mask = njit(cache=True)(_violations_mask_loop) if NUMBA_AVAILABLE else _violations_mask_numpy
+
+
 @dataclass
 class ComplianceResult:
     """Compliance check result"""
@@ -42,25 +86,134 @@ class SanctionsList:
     aliases: List[str]
 
 
+class QuantizedSentenceEncoder:
+    """
+    int8-quantized ONNX Runtime MiniLM encoder
+    Drop-in for the subset of SentenceTransformer.encode used by the agent
+    """
+    
+    MODEL_FILE = "model_quantized.onnx"
+    
+    def __init__(self, model_dir: str):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir, file_name=self.MODEL_FILE)
+    
+    @classmethod
+    def export(cls, output_dir: str, model_id: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        """Export a model to ONNX and apply dynamic int8 quantization"""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=output_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(output_dir)
+        logger.info(f"Exported int8 ONNX model to {output_dir}")
+    
+    def encode(self, sentences: List[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        """Encode sentences with mean pooling over token embeddings"""
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size], padding=True, truncation=True, return_tensors="np"
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+            batches.append(embeddings.astype(np.float32, copy=False))
+        
+        return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+
 class ComplianceAgent:
     """
     Compliance checking agent with OFAC/PEP screening and policy RAG
     """
     
-    def __init__(self, policy_db_path: str = "data/policies"):
+    # Up to this many policies, retrieval is a single matmul over the
+    # normalized embeddings; above it, an HNSW graph index is searched
+    BRUTE_FORCE_MAX_POLICIES = 500
+    
+    # HNSW graph degree and build/search beam widths
+    HNSW_M = 32
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = 64
+    
+    # Max number of distinct query embeddings kept in memory
+    QUERY_CACHE_SIZE = 4096
+    
+    # Max number of distinct merchant strings whose screening results are memoized
+    SCREENING_CACHE_SIZE = 50000
+    
+    # Bit encodings of the transaction attributes policy rules test
+    CATEGORY_BITS = {'entertainment': 1, 'travel': 2}
+    FLAG_BITS = {'manager_approval': 1, 'competitive_bids': 2, 'corporate_booking': 4}
+    
+    # Optional int8 ONNX export of the embedding model (see QuantizedSentenceEncoder.export)
+    QUANTIZED_MODEL_DIR = "models/embeddings/all-MiniLM-L6-v2-int8"
+    
+    # Process-wide embedding model, loaded on first use and shared by all instances
+    _model = None
+    _model_lock = threading.Lock()
+    
+    def __init__(self, policy_db_path: str = "data/policies", quantized_model_dir: str = QUANTIZED_MODEL_DIR):
         self.policy_db_path = policy_db_path
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self._quantized_model_dir = quantized_model_dir
+        self._encode_query_cached = functools.lru_cache(maxsize=self.QUERY_CACHE_SIZE)(self._encode_query)
         
         # Initialize sanctions lists (mock data)
         self.sanctions_lists = self._load_sanctions_lists()
         self.pep_list = self._load_pep_list()
+        self._sanctions_ac = None
+        self._pep_ac = None
+        self._sanctions_cache: OrderedDict[str, tuple[bool, tuple[str, ...]]] = OrderedDict()
+        self._pep_cache: OrderedDict[str, tuple[bool, tuple[str, ...]]] = OrderedDict()
+        self._build_screening_index()
         
-        # Initialize policy RAG
-        self.policy_embeddings = None
+        # Initialize policy RAG (embeddings and index are built or loaded on first retrieval)
+        self._policy_index_mmapped = False
         self.policy_texts = []
-        self.policy_index = None
+        self._policy_rules = []
         self._initialize_policy_rag()
         
+    @classmethod
+    def _get_model(cls, quantized_model_dir: str = QUANTIZED_MODEL_DIR):
+        """Get or lazily load the shared embedding model"""
+        if cls._model is None:
+            with cls._model_lock:
+                if cls._model is None:
+                    cls._model = cls._load_embedding_model(quantized_model_dir)
+        return cls._model
+    
+    @property
+    def embedding_model(self):
+        return self._get_model(self._quantized_model_dir)
+    
+    @staticmethod
+    def _load_embedding_model(quantized_model_dir: str):
+        """Load the int8 ONNX encoder if exported, else the FP32 SentenceTransformer"""
+        if quantized_model_dir and os.path.exists(os.path.join(quantized_model_dir, QuantizedSentenceEncoder.MODEL_FILE)):
+            try:
+                model = QuantizedSentenceEncoder(quantized_model_dir)
+                logger.info(f"Loaded int8 ONNX embedding model from {quantized_model_dir}")
+                return model
+            except Exception as e:
+                logger.warning(f"Could not load quantized embedding model: {e}")
+        
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer('all-MiniLM-L6-v2')
+    
     def _load_sanctions_lists(self) -> List[SanctionsList]:
         """Load mock OFAC sanctions lists"""
         # In production, this would connect to actual OFAC API
@@ -107,8 +260,49 @@ class ComplianceAgent:
         logger.info(f"Loaded {len(mock_peps)} PEP entries")
         return mock_peps
     
+    def _build_screening_index(self):
+        """Build Aho-Corasick automata over sanctions names/aliases and PEP terms"""
+        # Memoized screening results are only valid for the lists they were computed from
+        self._sanctions_cache.clear()
+        self._pep_cache.clear()
+        
+        # Lowercased names/aliases, computed once per list version
+        self._sanctions_norm = [
+            (sanction, sanction.entity_name.lower(), [alias.lower() for alias in sanction.aliases])
+            for sanction in self.sanctions_lists
+        ]
+        
+        # Reverse-direction lookup (entity name contained in a sanctioned term):
+        # all terms joined into one haystack, searched with a single str.find scan
+        self._sanctions_terms = []
+        self._sanctions_term_starts = []
+        offset = 0
+        for idx, sanction in enumerate(self.sanctions_lists):
+            for rank, term in enumerate([sanction.entity_name] + sanction.aliases):
+                self._sanctions_terms.append((idx, rank, term))
+                self._sanctions_term_starts.append(offset)
+                offset += len(term) + 1
+        self._sanctions_haystack = "\x00".join(term.lower() for _, _, term in self._sanctions_terms)
+        
+        if not AHOCORASICK_AVAILABLE:
+            return
+        
+        self._sanctions_ac = ahocorasick.Automaton()
+        for idx, rank, term in self._sanctions_terms:
+            key = term.lower()
+            if key in self._sanctions_ac:
+                self._sanctions_ac.get(key).append((idx, rank, term))
+            else:
+                self._sanctions_ac.add_word(key, [(idx, rank, term)])
+        self._sanctions_ac.make_automaton()
+        
+        self._pep_ac = ahocorasick.Automaton()
+        for pep_term in self.pep_list:
+            self._pep_ac.add_word(pep_term, pep_term)
+        self._pep_ac.make_automaton()
+    
     def _initialize_policy_rag(self):
-        """Initialize policy retrieval system with vector embeddings"""
+        """Initialize policy texts and their precompiled rule checks"""
         # Mock company policies
         self.policy_texts = [
             "All transactions above $10,000 require manager approval and documented business justification.",
@@ -123,107 +317,274 @@ class ComplianceAgent:
             "Cash advances are limited to $1,000 and require repayment within 30 days with receipts."
         ]
         
-        # Generate embeddings
+        # Pre-parse policy texts into rule checks, once
+        self._policy_rules = [self._compile_policy_rules(policy) for policy in self.policy_texts]
+        self._build_rule_table()
+        
+        logger.info(f"Policy RAG initialized with {len(self.policy_texts)} policies")
+    
+    def _policy_cache_path(self, suffix: str) -> str:
+        """On-disk cache path keyed by the embedding model and the exact policy texts"""
+        # Quantized and FP32 models produce different embeddings
+        quantized = os.path.exists(os.path.join(self._quantized_model_dir or "", QuantizedSentenceEncoder.MODEL_FILE))
+        digest = hashlib.sha256(b"int8" if quantized else b"fp32")
+        for text in self.policy_texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\x00")
+        return os.path.join(self.policy_db_path, f"policies-{digest.hexdigest()[:16]}{suffix}")
+    
+    def _persist_policy_cache(self, path: str, write: Callable[[], None]):
+        """Best-effort write of a policy cache file"""
+        try:
+            os.makedirs(self.policy_db_path, exist_ok=True)
+            write()
+            logger.info(f"Saved policy cache: {path}")
+        except Exception as e:
+            logger.warning(f"Could not save policy cache {path}: {e}")
+    
+    @functools.cached_property
+    def policy_embeddings(self) -> np.ndarray:
+        """L2-normalized policy embeddings (as _encode returns them), so inner product == cosine similarity"""
+        path = self._policy_cache_path(".npy")
+        if os.path.exists(path):
+            logger.info(f"Memory-mapping policy embeddings from {path}")
+            return np.load(path, mmap_mode='r')
+        
         logger.info("Generating policy embeddings for RAG")
-        self.policy_embeddings = self.embedding_model.encode(self.policy_texts)
+        embeddings = self._encode(self.policy_texts)
+        self._persist_policy_cache(path, lambda: np.save(path, embeddings))
+        return embeddings
+    
+    @functools.cached_property
+    def policy_index(self):
+        """FAISS index over the policy embeddings for fast similarity search"""
+        import faiss
+        
+        use_hnsw = len(self.policy_texts) > self.BRUTE_FORCE_MAX_POLICIES
+        path = self._policy_cache_path(".hnsw.faiss" if use_hnsw else ".flat.faiss")
+        if os.path.exists(path):
+            logger.info(f"Memory-mapping policy index from {path}")
+            self._policy_index_mmapped = True
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP)
         
-        # Create FAISS index for fast similarity search
         dimension = self.policy_embeddings.shape[1]
-        self.policy_index = faiss.IndexFlatL2(dimension)
-        self.policy_index.add(self.policy_embeddings.astype('float32'))
+        if use_hnsw:
+            # Approximate search, ~O(log N) per query on large corpora
+            index = faiss.IndexHNSWFlat(dimension, self.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.HNSW_EF_CONSTRUCTION
+            index.add(self.policy_embeddings)
+            index.hnsw.efSearch = self.HNSW_EF_SEARCH
+        else:
+            index = faiss.IndexFlatIP(dimension)
+            index.add(self.policy_embeddings)
         
-        logger.info(f"Policy RAG initialized with {len(self.policy_texts)} policies")
+        self._policy_index_mmapped = False
+        self._persist_policy_cache(path, lambda: faiss.write_index(index, path))
+        return index
+    
+    def _memoized(self, cache: OrderedDict, key: str, compute: Callable[[], tuple[bool, List[str]]]) -> tuple[bool, List[str]]:
+        """LRU lookup of a screening result, computing and storing it on a miss"""
+        cached = cache.get(key)
+        if cached is not None:
+            cache.move_to_end(key)
+        else:
+            hit, matches = compute()
+            cached = (hit, tuple(matches))
+            cache[key] = cached
+            if len(cache) > self.SCREENING_CACHE_SIZE:
+                cache.popitem(last=False)
+        
+        return cached[0], list(cached[1])
     
     def _check_sanctions(self, entity_name: str, entity_type: str = "ORGANIZATION") -> tuple[bool, List[str]]:
         """Check if entity is on sanctions list"""
         entity_lower = entity_name.lower()
+        hit, matches = self._memoized(self._sanctions_cache, entity_lower, lambda: self._screen_sanctions(entity_lower))
+        if hit:
+            logger.warning(f"SANCTIONS HIT: {entity_name} - {matches}")
+        
+        return hit, matches
+    
+    def _screen_sanctions(self, entity_lower: str) -> tuple[bool, List[str]]:
+        """Scan the sanctions lists for a lowercased entity name"""
+        # An empty name is a substring of every entry - treat it as no match on both paths
+        if not entity_lower:
+            return False, []
+        
         matches = []
         
-        for sanction in self.sanctions_lists:
+        if self._sanctions_ac is not None:
+            # Best hit per sanctions entry: rank 0 is the main name, then aliases in order
+            best = {}
+            for _, entries in self._sanctions_ac.iter(entity_lower):
+                for idx, rank, term in entries:
+                    if idx not in best or rank < best[idx][0]:
+                        best[idx] = (rank, term)
+            pos = self._sanctions_haystack.find(entity_lower)
+            while pos != -1:
+                idx, rank, term = self._sanctions_terms[bisect.bisect_right(self._sanctions_term_starts, pos) - 1]
+                if idx not in best or rank < best[idx][0]:
+                    best[idx] = (rank, term)
+                pos = self._sanctions_haystack.find(entity_lower, pos + 1)
+            
+            for idx in sorted(best):
+                sanction = self.sanctions_lists[idx]
+                rank, term = best[idx]
+                if rank == 0:
+                    matches.append(f"Matched {sanction.list_type}: {sanction.entity_name}")
+                else:
+                    matches.append(f"Matched {sanction.list_type} alias: {term} -> {sanction.entity_name}")
+            
+            return len(matches) > 0, matches
+        
+        for sanction, name_lower, aliases_lower in self._sanctions_norm:
             # Check main name
-            if sanction.entity_name.lower() in entity_lower or entity_lower in sanction.entity_name.lower():
+            if name_lower in entity_lower or entity_lower in name_lower:
                 matches.append(f"Matched {sanction.list_type}: {sanction.entity_name}")
                 continue
             
             # Check aliases
-            for alias in sanction.aliases:
-                if alias.lower() in entity_lower or entity_lower in alias.lower():
+            for alias, alias_lower in zip(sanction.aliases, aliases_lower):
+                if alias_lower in entity_lower or entity_lower in alias_lower:
                     matches.append(f"Matched {sanction.list_type} alias: {alias} -> {sanction.entity_name}")
                     break
         
-        hit = len(matches) > 0
-        if hit:
-            logger.warning(f"SANCTIONS HIT: {entity_name} - {matches}")
-        
-        return hit, matches
+        return len(matches) > 0, matches
     
     def _check_pep(self, entity_description: str) -> tuple[bool, List[str]]:
         """Check if entity might be a Politically Exposed Person"""
         desc_lower = entity_description.lower()
-        matches = []
-        
-        for pep_term in self.pep_list:
-            if pep_term in desc_lower:
-                matches.append(f"PEP indicator: {pep_term}")
-        
-        hit = len(matches) > 0
+        hit, matches = self._memoized(self._pep_cache, desc_lower, lambda: self._screen_pep(desc_lower))
         if hit:
             logger.warning(f"PEP HIT: {entity_description} - {matches}")
         
         return hit, matches
     
-    def _retrieve_relevant_policies(self, transaction: Dict, k: int = 3) -> List[str]:
-        """Retrieve relevant policies using RAG"""
-        # Create query from transaction
+    def _screen_pep(self, desc_lower: str) -> tuple[bool, List[str]]:
+        """Scan the PEP terms for a lowercased description"""
+        matches = []
+        
+        if self._pep_ac is not None:
+            found = dict.fromkeys(term for _, term in self._pep_ac.iter(desc_lower))
+            matches = [f"PEP indicator: {pep_term}" for pep_term in found]
+        else:
+            for pep_term in self.pep_list:
+                if pep_term in desc_lower:
+                    matches.append(f"PEP indicator: {pep_term}")
+        
+        return len(matches) > 0, matches
+    
+    @staticmethod
+    def _make_query(transaction: Dict) -> str:
+        """Build a canonical RAG query so similar transactions share a cache entry"""
+        # Bucket amounts to the nearest $100 and normalize case
+        amount = round(float(transaction.get('amount', 0)), -2)
         query_parts = [
-            f"Transaction amount ${transaction.get('amount', 0)}",
-            f"Category: {transaction.get('category', 'unknown')}",
-            f"Merchant: {transaction.get('merchant', 'unknown')}"
+            f"Transaction amount ${amount:.0f}",
+            f"Category: {str(transaction.get('category', 'unknown')).lower()}",
+            f"Merchant: {str(transaction.get('merchant', 'unknown')).lower()}"
         ]
-        query = " ".join(query_parts)
-        
-        # Encode query
-        query_embedding = self.embedding_model.encode([query])
+        return " ".join(query_parts)
+    
+    def _encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts to L2-normalized float32 embeddings without an extra dtype copy"""
+        embeddings = self.embedding_model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        # No-op for the float32 arrays sentence-transformers returns; casts other backends
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Encode a query string to a normalized float32 embedding"""
+        embedding = self._encode([query])[0]
+        # Cached arrays are shared between callers
+        embedding.setflags(write=False)
+        return embedding
+    
+    def _retrieve_relevant_policies(self, transaction: Dict, k: int = 3) -> List[str]:
+        """Retrieve relevant policies using RAG"""
+        return [self.policy_texts[idx] for idx in self._retrieve_relevant_policy_indices(transaction, k)]
+    
+    def _retrieve_relevant_policy_indices(self, transaction: Dict, k: int = 3) -> List[int]:
+        """Retrieve indices of relevant policies using RAG"""
+        # Create query from transaction and encode it (cached per query string)
+        query_embedding = self._encode_query_cached(self._make_query(transaction))
         
         # Search for similar policies
-        distances, indices = self.policy_index.search(
-            query_embedding.astype('float32'), 
-            k
-        )
+        relevant_indices = [int(idx) for idx in self._search_policies(query_embedding.reshape(1, -1), k)[0]]
+        logger.info(f"Retrieved {len(relevant_indices)} relevant policies")
         
-        relevant_policies = [self.policy_texts[idx] for idx in indices[0]]
-        logger.info(f"Retrieved {len(relevant_policies)} relevant policies")
+        return relevant_indices
+    
+    def _search_policies(self, query_embeddings: np.ndarray, k: int) -> np.ndarray:
+        """Return the (N, k) indices of the top-k policies for each row of query embeddings"""
+        k = min(k, len(self.policy_texts))
+        if len(self.policy_texts) <= self.BRUTE_FORCE_MAX_POLICIES:
+            scores = query_embeddings @ self.policy_embeddings.T
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+            return np.take_along_axis(top, order, axis=1)
         
-        return relevant_policies
+        _, found = self.policy_index.search(query_embeddings, k)
+        return found
     
-    def _check_policy_violations(self, transaction: Dict, policies: List[str]) -> List[str]:
-        """Check for policy violations"""
+    @classmethod
+    def _compile_policy_rules(cls, policy: str) -> List[tuple[float, int, int]]:
+        """
+        Turn a policy text into numeric rules of (amount threshold, category bits, required flag bits)
+        
+        A rule is violated when amount > threshold, the transaction category has
+        all of the category bits, and the transaction has none of the flag bits.
+        """
+        policy_lower = policy.lower()
+        rules = []
+        
+        # Amount thresholds
+        if 'above $10,000' in policy_lower:
+            rules.append((10000.0, 0, cls.FLAG_BITS['manager_approval']))
+        
+        if 'above $25,000' in policy_lower:
+            rules.append((25000.0, 0, cls.FLAG_BITS['competitive_bids']))
+        
+        # Entertainment limits
+        if 'entertainment' in policy_lower:
+            rules.append((500.0, cls.CATEGORY_BITS['entertainment'], 0))
+        
+        # Travel requirements
+        if 'travel' in policy_lower:
+            rules.append((-np.inf, cls.CATEGORY_BITS['travel'], cls.FLAG_BITS['corporate_booking']))
+        
+        return rules
+    
+    def _build_rule_table(self):
+        """Flatten per-policy rules into parallel arrays for the violations kernel"""
+        rows = [rule for rules in self._policy_rules for rule in rules]
+        self._rule_offsets = np.cumsum([0] + [len(rules) for rules in self._policy_rules])
+        self._rule_thresholds = np.array([row[0] for row in rows], dtype=np.float64)
+        self._rule_category_mask = np.array([row[1] for row in rows], dtype=np.int64)
+        self._rule_flag_requirement = np.array([row[2] for row in rows], dtype=np.int64)
+    
+    def _check_policy_violations(self, transaction: Dict, policy_indices: List[int]) -> List[str]:
+        """Check for policy violations against the given policies"""
         violations = []
         amount = float(transaction.get('amount', 0))
         category = transaction.get('category', '').lower()
+        category_bits = sum(bit for name, bit in self.CATEGORY_BITS.items() if name in category)
+        flags = sum(bit for name, bit in self.FLAG_BITS.items() if transaction.get(name))
         
-        # Check against each policy
-        for policy in policies:
-            policy_lower = policy.lower()
-            
-            # Amount thresholds
-            if 'above $10,000' in policy_lower and amount > 10000:
-                if not transaction.get('manager_approval'):
-                    violations.append(f"Policy violation: {policy}")
-            
-            if 'above $25,000' in policy_lower and amount > 25000:
-                if not transaction.get('competitive_bids'):
-                    violations.append(f"Policy violation: {policy}")
-            
-            # Entertainment limits
-            if 'entertainment' in policy_lower and 'entertainment' in category:
-                if amount > 500:
-                    violations.append(f"Policy violation: {policy}")
-            
-            # Travel requirements
-            if 'travel' in policy_lower and 'travel' in category:
-                if not transaction.get('corporate_booking'):
-                    violations.append(f"Policy violation: {policy}")
+        # Evaluate the whole rule table at once, then report rules of the given policies
+        violated = _violations_mask(
+            amount, category_bits, flags,
+            self._rule_thresholds, self._rule_category_mask, self._rule_flag_requirement
+        )
+        for idx in policy_indices:
+            for rule in range(self._rule_offsets[idx], self._rule_offsets[idx + 1]):
+                if violated[rule]:
+                    violations.append(f"Policy violation: {self.policy_texts[idx]}")
         
         return violations
     
@@ -239,6 +600,10 @@ class ComplianceAgent:
         """
         logger.info(f"Checking compliance for transaction: {transaction.get('transaction_id')}")
         
+        return self._evaluate(transaction, self._retrieve_relevant_policy_indices(transaction))
+    
+    def _evaluate(self, transaction: Dict, relevant_indices: List[int]) -> ComplianceResult:
+        """Screen a transaction and score it against already-retrieved policies"""
         merchant = transaction.get('merchant', 'Unknown')
         amount = float(transaction.get('amount', 0))
         
@@ -249,9 +614,9 @@ class ComplianceAgent:
         merchant_description = transaction.get('merchant_description', merchant)
         pep_hit, pep_matches = self._check_pep(merchant_description)
         
-        # Retrieve and check policies
-        relevant_policies = self._retrieve_relevant_policies(transaction)
-        policy_violations = self._check_policy_violations(transaction, relevant_policies)
+        # Check retrieved policies
+        relevant_policies = [self.policy_texts[idx] for idx in relevant_indices]
+        policy_violations = self._check_policy_violations(transaction, relevant_indices)
         
         # Calculate risk score
         risk_score = 0.0
@@ -299,22 +664,62 @@ class ComplianceAgent:
         logger.info(f"Compliance check complete: {status} (risk: {risk_score:.2f})")
         return result
     
-    def batch_check(self, transactions: List[Dict]) -> List[ComplianceResult]:
-        """Batch process multiple transactions"""
-        return [self.check_compliance(txn) for txn in transactions]
+    def batch_check(self, transactions: List[Dict], k: int = 3) -> List[ComplianceResult]:
+        """
+        Batch process multiple transactions
+        
+        Queries are encoded in one batched call and searched as a single (N, k)
+        matrix, so the embedding model runs once per distinct query rather than
+        once per transaction.
+        
+        Args:
+            transactions: List of transaction dicts
+            k: Number of policies to retrieve per transaction
+            
+        Returns:
+            ComplianceResults in the same order as the transactions
+        """
+        if not transactions:
+            return []
+        
+        logger.info(f"Batch checking compliance for {len(transactions)} transactions")
+        
+        # Canonical queries collapse near-duplicate transactions onto one row
+        queries = [self._make_query(txn) for txn in transactions]
+        unique_queries = list(dict.fromkeys(queries))
+        row_of = {query: row for row, query in enumerate(unique_queries)}
+        
+        embeddings = self._encode(unique_queries, batch_size=64)
+        found = self._search_policies(embeddings, k)
+        
+        return [
+            self._evaluate(txn, [int(idx) for idx in found[row_of[query]]])
+            for txn, query in zip(transactions, queries)
+        ]
     
     def update_sanctions_list(self, new_entries: List[SanctionsList]):
         """Update sanctions list with new entries"""
         self.sanctions_lists.extend(new_entries)
+        self._build_screening_index()
         logger.info(f"Added {len(new_entries)} new sanctions entries")
     
     def add_policy(self, policy_text: str):
         """Add a new policy to the RAG system"""
         self.policy_texts.append(policy_text)
+        self._policy_rules.append(self._compile_policy_rules(policy_text))
+        self._build_rule_table()
         
-        # Re-generate embeddings
-        new_embedding = self.embedding_model.encode([policy_text])
-        self.policy_index.add(new_embedding.astype('float32'))
+        # Extend embeddings/index only if already built; otherwise the lazy build picks it up
+        if 'policy_embeddings' in self.__dict__:
+            new_embedding = self._encode([policy_text])
+            self.policy_embeddings = np.vstack([self.policy_embeddings, new_embedding])
+            if 'policy_index' in self.__dict__:
+                if self._policy_index_mmapped or len(self.policy_texts) == self.BRUTE_FORCE_MAX_POLICIES + 1:
+                    # Read-only mapped index, or corpus just outgrew the flat index:
+                    # rebuild (as HNSW if needed) on next search
+                    del self.policy_index
+                else:
+                    self.policy_index.add(new_embedding)
         
         logger.info(f"Added new policy: {policy_text[:50]}...")
 
@@ -5,7 +5,8 @@ Based on AWS fraud detection patterns with PyOD anomaly detection
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from collections.abc import Hashable
+from typing import Callable, Dict, List, Tuple
 from dataclasses import dataclass
 import logging
 from datetime import datetime, timedelta
@@ -18,12 +19,211 @@ from pyod.models.cblof import CBLOF
 from pyod.models.hbos import HBOS
 
 from sklearn.preprocessing import StandardScaler
+from sklearn.feature_selection import mutual_info_classif
+from scipy.special import erf
 from sklearn.ensemble import RandomForestClassifier
-import pickle
+import joblib
+import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import zlib
+from functools import lru_cache
+
+# JIT compilation of the risk rule kernels
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logging.warning("numba not available, fraud risk rules will be evaluated with NumPy")
 
 logger = logging.getLogger(__name__)
 
+# Risk rule bits returned by _rule_mask
+_RULE_HIGH_AMOUNT = 1
+_RULE_UNUSUAL_TIME = 2
+_RULE_WEEKEND = 4
+_RULE_ROUND_AMOUNT = 8
+_RULE_VELOCITY = 16
+
+
+def _rule_mask_scalar(amount, hour, weekday, daily_count):
+    """Bitmask of the risk rules one transaction triggers"""
+    mask = 0
+    if amount > 10000:
+        mask |= _RULE_HIGH_AMOUNT
+    if hour < 6 or hour > 22:
+        mask |= _RULE_UNUSUAL_TIME
+    if weekday >= 5:
+        mask |= _RULE_WEEKEND
+    if amount % 1000 == 0 and amount >= 1000:
+        mask |= _RULE_ROUND_AMOUNT
+    if daily_count > 10:
+        mask |= _RULE_VELOCITY
+    return mask
+
+
+def _rule_mask_vec_numpy(amounts: np.ndarray, hours: np.ndarray, weekdays: np.ndarray,
+                         daily_counts: np.ndarray) -> np.ndarray:
+    """Risk rule bitmask per transaction, for a batch"""
+    return (
+        (amounts > 10000) * _RULE_HIGH_AMOUNT
+        | ((hours < 6) | (hours > 22)) * _RULE_UNUSUAL_TIME
+        | (weekdays >= 5) * _RULE_WEEKEND
+        | ((amounts % 1000 == 0) & (amounts >= 1000)) * _RULE_ROUND_AMOUNT
+        | (daily_counts > 10) * _RULE_VELOCITY
+    ).astype(np.uint8)
+
+
+def _rule_mask_vec_loop(amounts, hours, weekdays, daily_counts):
+    masks = np.empty(amounts.shape[0], dtype=np.uint8)
+    for i in prange(amounts.shape[0]):
+        masks[i] = _rule_mask(amounts[i], hours[i], weekdays[i], daily_counts[i])
+    return masks
+
+
+if NUMBA_AVAILABLE:
+    _rule_mask = njit(cache=True)(_rule_mask_scalar)
+    _rule_mask_vec = njit(cache=True, parallel=True)(_rule_mask_vec_loop)
+else:
+    _rule_mask = _rule_mask_scalar
+    _rule_mask_vec = _rule_mask_vec_numpy
+
+
+def _describe_rules(mask: int, amount: float, hour: int, daily_count) -> List[str]:
+    """Human-readable risk factors for the rules set in a bitmask"""
+    risk_factors = []
+    if mask & _RULE_HIGH_AMOUNT:
+        risk_factors.append(f"High transaction amount: ${amount:,.2f}")
+    if mask & _RULE_UNUSUAL_TIME:
+        risk_factors.append(f"Unusual transaction time: {hour}:00")
+    if mask & _RULE_WEEKEND:
+        risk_factors.append("Weekend transaction")
+    if mask & _RULE_ROUND_AMOUNT:
+        risk_factors.append("Round number amount (potential test transaction)")
+    if mask & _RULE_VELOCITY:
+        risk_factors.append(f"High transaction velocity: {daily_count} transactions today")
+    return risk_factors
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(timestamp: str) -> datetime:
+    """Parse an ISO-8601 timestamp, accepting a trailing Z"""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _parse_ts(timestamp) -> datetime:
+    """Transaction timestamp as a datetime; now when missing"""
+    if timestamp is None:
+        return datetime.now()
+    if isinstance(timestamp, str):
+        return _parse_iso(timestamp)
+    return timestamp
+
+
+def _category_value(value) -> str:
+    """A categorical field as the string the code tables are keyed by; None and NaN are 'unknown'"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'unknown'
+    return value if isinstance(value, str) else str(value)
+
+
+def _compile_feature_filler(cat_maps: Dict[str, Dict[str, int]], buckets: Dict[str, int]):
+    """
+    Generate a straight-line function filling one feature row in place
+    
+    The categorical code tables are bound into the generated function (crc32
+    buckets for columns without a table), so a call is only field reads and
+    slot writes - amount, log amount, hour, weekday, weekend flag, the
+    categorical codes, then the velocity features.
+    """
+    namespace = {'log1p': np.log1p, 'crc32': zlib.crc32, 'category': _category_value}
+    lines = [
+        "def fill_features(transaction, row, timestamp):",
+        "    get = transaction.get",
+        "    amount = float(get('amount', 0))",
+        "    row[0] = amount",
+        "    row[1] = log1p(amount)",
+        "    weekday = timestamp.weekday()",
+        "    row[2] = timestamp.hour",
+        "    row[3] = weekday",
+        "    row[4] = weekday >= 5",
+    ]
+    for slot, (column, bucket_count) in enumerate(buckets.items(), start=5):
+        # Strings are used as-is; other values go through category()
+        lines.append(f"    value = get({column!r})")
+        value = "(value if value.__class__ is str else category(value))"
+        if column in cat_maps:
+            namespace[f"codes_{slot}"] = cat_maps[column]
+            lines.append(f"    row[{slot}] = codes_{slot}.get({value}, 0)")
+        else:
+            lines.append(f"    row[{slot}] = crc32({value}.encode('utf-8')) % {bucket_count}")
+    lines += [
+        "    row[9] = get('daily_transaction_count', 1)",
+        "    row[10] = get('daily_transaction_volume', amount)",
+    ]
+    exec("\n".join(lines), namespace)
+    return namespace['fill_features']
+
+
+# Numeric transaction fields read by feature extraction and the risk rules
+_NUMERIC_FIELDS = ('amount', 'daily_transaction_count', 'daily_transaction_volume')
+
+
+def _validate_transaction(transaction) -> datetime:
+    """
+    Check the fields fraud scoring reads and return the parsed timestamp
+    
+    Raises:
+        TypeError, ValueError: naming the offending field
+    """
+    if not isinstance(transaction, dict):
+        raise TypeError(f"transaction must be a dict, got {type(transaction).__name__}")
+    
+    for field in _NUMERIC_FIELDS:
+        if field not in transaction:
+            continue
+        value = transaction[field]
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number, got {value!r}") from None
+        if not math.isfinite(number):
+            raise ValueError(f"{field} must be finite, got {value!r}")
+    
+    # Categorical values are encoded by their string form, so any scalar will do
+    for field in FraudDetectionAgent.CATEGORICAL_FEATURES:
+        value = transaction.get(field)
+        if isinstance(value, (tuple, frozenset)) or not isinstance(value, Hashable):
+            raise TypeError(f"{field} must be a scalar, got {type(value).__name__}")
+    
+    timestamp = transaction.get('timestamp')
+    if timestamp is not None and not isinstance(timestamp, (str, datetime)):
+        raise TypeError(f"timestamp must be an ISO-8601 string or datetime, got {type(timestamp).__name__}")
+    try:
+        return _parse_ts(timestamp)
+    except ValueError:
+        raise ValueError(f"timestamp is not ISO-8601: {timestamp!r}") from None
+
+
+def _float32_scaler(scaler: StandardScaler) -> StandardScaler:
+    """
+    Store a fitted scaler's statistics as float32
+    
+    StandardScaler keeps mean_/scale_ in float64, which upcasts every
+    float32 feature row it transforms.
+    """
+    scaler.mean_ = scaler.mean_.astype(np.float32)
+    scaler.scale_ = scaler.scale_.astype(np.float32)
+    return scaler
+
+
+@lru_cache(maxsize=None)
+def _identity_scaler(n_features: int) -> StandardScaler:
+    """Scaler with mean 0 and scale 1, for agents that have not been trained"""
+    return _float32_scaler(StandardScaler().fit(np.zeros((1, n_features), dtype=np.float32)))
+
 
 @dataclass
 class FraudScore:
@@ -50,13 +250,59 @@ class FraudDetectionAgent:
         "CRITICAL": 0.85
     }
     
+    # Categorical columns and the bucket count of their untrained hash encoding
+    CATEGORICAL_FEATURES = {
+        'category': 100,
+        'merchant': 100,
+        'user_id': 100,
+        'location': 50
+    }
+    
+    # Width of the feature vector built by _extract_features
+    FEATURE_SLOTS = 11
+    
+    # Training set size above which KNN/LOF neighbor search uses an IVF index
+    BRUTE_FORCE_MAX_TRAINING = 20000
+    IVF_NPROBE = 8
+    
+    # Models scored from the shared neighbor index
+    NEIGHBOR_MODELS = ('knn', 'lof')
+    
+    # Ensemble weights per model
+    MODEL_WEIGHTS = {
+        'isolation_forest': 0.3,
+        'lof': 0.25,
+        'knn': 0.2,
+        'cblof': 0.15,
+        'hbos': 0.1
+    }
+    
     def __init__(self, model_dir: str = "models/fraud"):
         self.model_dir = model_dir
         self.models = {}
         self.scaler = StandardScaler()
         self.feature_names = []
         self.model_version = "1.0.0"
+        # Per-thread feature buffer for single-transaction scoring
+        self._local = threading.local()
+        self._load_lock = threading.Lock()
+        # Set once the scaler holds statistics from training data
+        self._fitted = False
+        # Per-model mean and std of the training decision scores, used to
+        # z-score new scores without refitting on the serving path
+        self._score_mu: Dict[str, float] = {}
+        self._score_sigma: Dict[str, float] = {}
+        # Per-column value -> code tables learned in train_models (0 = unseen)
+        self._cat_maps: Dict[str, Dict[str, int]] = {}
+        self._specialize_features()
+        # FAISS index over the scaled training features, shared by KNN and LOF
+        self._neighbor_index = None
+        # Modification time of a score_stats file that failed to load, so it
+        # is retried only once it has been rewritten
+        self._failed_stats_mtime = None
         self._initialize_models()
+        # Scores the ensemble members concurrently; threads start on first use
+        self._pool = ThreadPoolExecutor(max_workers=len(self.models), thread_name_prefix="fraud-score")
     
     def _initialize_models(self):
         """Initialize ensemble of anomaly detection models"""
@@ -95,91 +341,263 @@ class FraudDetectionAgent:
             contamination=0.05
         )
         
+        # Fixed model order and matching ensemble weights for the vectorized scoring;
+        # trained weights replace the defaults when labels were available
+        self._model_order = tuple(self.models)
+        self._weight_vec = np.array([self.MODEL_WEIGHTS.get(name, 0.0) for name in self._model_order])
+        
         # Load pre-trained models if available
         self._load_pretrained_models()
     
+    def _artifact_path(self, name: str):
+        """Path of a saved artifact, preferring joblib over legacy pickle files"""
+        for extension in ('joblib', 'pkl'):
+            path = f"{self.model_dir}/{name}.{extension}"
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def _load_artifact(self, name: str):
+        """Load a saved artifact, memory-mapping its numpy arrays from disk"""
+        # joblib.load also reads plain pickle files
+        return joblib.load(self._artifact_path(name), mmap_mode='r')
+    
     def _load_pretrained_models(self):
         """Load pre-trained models from disk"""
-        if os.path.exists(f"{self.model_dir}/scaler.pkl"):
+        if self._artifact_path('scaler'):
             try:
-                with open(f"{self.model_dir}/scaler.pkl", 'rb') as f:
-                    self.scaler = pickle.load(f)
+                self.scaler = _float32_scaler(self._load_artifact('scaler'))
+                self._fitted = True
                 logger.info("Loaded pre-trained scaler")
             except Exception as e:
                 logger.warning(f"Could not load scaler: {e}")
-    
-    def _extract_features(self, transaction: Dict) -> np.ndarray:
-        """Extract features from transaction data"""
-        features = []
-        
-        # Amount features
-        amount = float(transaction.get('amount', 0))
-        features.append(amount)
-        features.append(np.log1p(amount))  # Log amount
-        
-        # Time features
-        timestamp = transaction.get('timestamp', datetime.now().isoformat())
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
         
-        features.append(timestamp.hour)
-        features.append(timestamp.weekday())
-        features.append(1 if timestamp.weekday() >= 5 else 0)  # Weekend flag
+        if self._artifact_path('category_maps'):
+            try:
+                self._cat_maps = self._load_artifact('category_maps')
+                self._specialize_features()
+                logger.info("Loaded categorical encodings")
+            except Exception as e:
+                logger.warning(f"Could not load categorical encodings: {e}")
         
-        # Category encoding (simple hash for now)
-        category = transaction.get('category', 'unknown')
-        features.append(hash(category) % 100)
+        stats_path = self._artifact_path('score_stats')
+        if not stats_path:
+            return
         
-        # Merchant encoding
-        merchant = transaction.get('merchant', 'unknown')
-        features.append(hash(merchant) % 100)
+        # Models are only usable together with the score statistics they were trained with
+        try:
+            score_stats = self._load_artifact('score_stats')
+            for model_name in score_stats['mu']:
+                self.models[model_name] = self._load_artifact(model_name)
+            self._neighbor_index = self._load_neighbor_index()
+            weights = score_stats['weights']
+            self._weight_vec = np.array([weights.get(name, 0.0) for name in self._model_order])
+            self._score_sigma = score_stats['sigma']
+            # Assigned last: a non-empty _score_mu is what marks the models as trained
+            self._score_mu = score_stats['mu']
+            logger.info(f"Loaded pre-trained models: {', '.join(self._score_mu)}")
+        except Exception as e:
+            self._failed_stats_mtime = os.path.getmtime(stats_path)
+            logger.warning(f"Could not load pre-trained models: {e}")
+    
+    def _load_neighbor_index(self):
+        """Memory-map the saved neighbor index, if there is one and faiss is installed"""
+        path = f"{self.model_dir}/neighbor_index.faiss"
+        if not os.path.exists(path):
+            return None
+        try:
+            import faiss
+        except ImportError:
+            logger.warning("faiss not available, KNN/LOF will use exact neighbor search")
+            return None
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP)
+    
+    def _build_neighbor_index(self, features_scaled: np.ndarray):
+        """FAISS index over the training features for KNN/LOF neighbor queries"""
+        import faiss
+        
+        data = np.ascontiguousarray(features_scaled, dtype=np.float32)
+        count, dimension = data.shape
+        if count > self.BRUTE_FORCE_MAX_TRAINING:
+            # Approximate search, only IVF_NPROBE of ~sqrt(N) lists are scanned per query
+            quantizer = faiss.IndexFlatL2(dimension)
+            index = faiss.IndexIVFFlat(quantizer, dimension, int(np.sqrt(count)))
+            index.train(data)
+            index.nprobe = self.IVF_NPROBE
+        else:
+            index = faiss.IndexFlatL2(dimension)
+        index.add(data)
+        return index
+    
+    def _neighbor_scores(self, features_scaled: np.ndarray) -> Dict[str, np.ndarray]:
+        """KNN and LOF decision scores from a single query against the neighbor index"""
+        knn_k = self.models['knn'].n_neighbors
+        lof = self.models['lof'].detector_
+        lof_k = lof.n_neighbors_
+        
+        squared, indices = self._neighbor_index.search(
+            np.ascontiguousarray(features_scaled, dtype=np.float32), max(knn_k, lof_k)
+        )
+        if (indices < 0).any():
+            # The probed lists held fewer than k points - leave it to the exact models
+            return {}
+        distances = np.sqrt(np.maximum(squared, 0.0))
+        
+        # KNN (method='mean'): mean distance to the k nearest training points
+        knn_scores = distances[:, :knn_k].mean(axis=1)
+        
+        # LOF: ratio of the neighbors' local reachability density to the query's,
+        # as sklearn computes it, from the densities stored at fit time
+        neighbors = indices[:, :lof_k]
+        reach = np.maximum(distances[:, :lof_k], lof._distances_fit_X_[neighbors, lof_k - 1])
+        lrd = 1.0 / (reach.mean(axis=1) + 1e-10)
+        lof_scores = (lof._lrd[neighbors] / lrd[:, np.newaxis]).mean(axis=1)
+        
+        return {'knn': knn_scores, 'lof': lof_scores}
+    
+    def _raw_scores(self, features_scaled: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Decision scores of every trained model; failed or untrained models are left out
         
-        # User behavior features (would be enriched with historical data)
-        user_id = transaction.get('user_id', 'unknown')
-        features.append(hash(user_id) % 100)
+        The models score concurrently on the agent's thread pool - their
+        decision functions run in NumPy/Cython code that releases the GIL.
+        """
+        neighbor_future = None
+        if self._neighbor_index is not None:
+            neighbor_future = self._pool.submit(self._neighbor_scores, features_scaled)
+        
+        futures = {
+            model_name: self._pool.submit(self.models[model_name].decision_function, features_scaled)
+            for model_name in self._model_order
+            if model_name in self._score_mu
+            and (neighbor_future is None or model_name not in self.NEIGHBOR_MODELS)
+        }
         
-        # Geographic features (if available)
-        location = transaction.get('location', 'unknown')
-        features.append(hash(location) % 50)
+        raw_scores = {}
+        if neighbor_future is not None:
+            try:
+                raw_scores.update(neighbor_future.result())
+            except Exception as e:
+                logger.warning(f"Neighbor index search failed, using exact KNN/LOF: {e}")
+            # Exact models for whatever the index could not score
+            for model_name in self.NEIGHBOR_MODELS:
+                if model_name in self._score_mu and model_name not in raw_scores:
+                    futures[model_name] = self._pool.submit(self.models[model_name].decision_function,
+                                                            features_scaled)
+        
+        for model_name, future in futures.items():
+            try:
+                raw_scores[model_name] = future.result()
+            except Exception as e:
+                logger.warning(f"Model {model_name} failed: {e}")
+        return raw_scores
+    
+    def _ensure_loaded(self):
+        """Pick up models trained and saved since this agent was created"""
+        if self._score_mu:
+            return
+        stats_path = self._artifact_path('score_stats')
+        if not stats_path or os.path.getmtime(stats_path) == self._failed_stats_mtime:
+            return
+        # Concurrent requests on the shared agent load the models only once
+        with self._load_lock:
+            if not self._score_mu and os.path.getmtime(stats_path) != self._failed_stats_mtime:
+                self._load_pretrained_models()
+    
+    def _normalize_scores(self, model_name: str, raw_scores):
+        """
+        Map raw decision scores to 0-1 via the training z-score
         
-        # Transaction velocity features (placeholder - would use real history)
-        features.append(transaction.get('daily_transaction_count', 1))
-        features.append(transaction.get('daily_transaction_volume', amount))
+        Uses PyOD's 'unify' transform, erf(z / sqrt(2)) clipped at 0, so scores
+        from different detectors are comparable and at or below the training
+        mean count as no anomaly.
+        """
+        z = (raw_scores - self._score_mu[model_name]) / self._score_sigma[model_name]
+        return np.clip(erf(z / np.sqrt(2)), 0.0, 1.0)
+    
+    def _encode_category(self, column: str, value) -> int:
+        """Encode a categorical value with the trained table, or a stable hash before training"""
+        value = _category_value(value)
+        codes = self._cat_maps.get(column)
+        if codes is not None:
+            return codes.get(value, 0)
+        # crc32 rather than hash(), which is salted per process
+        return zlib.crc32(value.encode('utf-8')) % self.CATEGORICAL_FEATURES[column]
+    
+    def _extract_features(self, transaction: Dict, timestamp: datetime) -> np.ndarray:
+        """
+        Extract features from transaction data
         
-        return np.array(features).reshape(1, -1)
+        Fills this thread's preallocated (1, FEATURE_SLOTS) float32 buffer, which
+        is overwritten by the next call on the same thread.
+        """
+        features = getattr(self._local, 'feature_buffer', None)
+        if features is None:
+            features = self._local.feature_buffer = np.empty((1, self.FEATURE_SLOTS), dtype=np.float32)
+        self._fill_features(transaction, features[0], timestamp)
+        return features
+    
+    def _specialize_features(self):
+        """Regenerate the single-transaction feature filler for the current code tables"""
+        self._fill_features = _compile_feature_filler(self._cat_maps, self.CATEGORICAL_FEATURES)
+    
+    def _extract_features_batch(self, transactions: List[Dict], timestamps: List[datetime]) -> np.ndarray:
+        """Extract features for many transactions into one (N, FEATURE_SLOTS) float32 matrix"""
+        features = np.empty((len(transactions), self.FEATURE_SLOTS), dtype=np.float32)
+        
+        # Same column order as _extract_features
+        amounts = np.fromiter((float(txn.get('amount', 0)) for txn in transactions), dtype=np.float64,
+                              count=len(transactions))
+        features[:, 0] = amounts
+        features[:, 1] = np.log1p(amounts)
+        features[:, 2] = [ts.hour for ts in timestamps]
+        features[:, 3] = [ts.weekday() for ts in timestamps]
+        features[:, 4] = features[:, 3] >= 5
+        for slot, column in enumerate(self.CATEGORICAL_FEATURES, start=5):
+            features[:, slot] = [self._encode_category(column, txn.get(column)) for txn in transactions]
+        features[:, 9] = [txn.get('daily_transaction_count', 1) for txn in transactions]
+        features[:, 10] = [txn.get('daily_transaction_volume', amount) for txn, amount in zip(transactions, amounts)]
+        
+        return features
     
-    def _calculate_risk_factors(self, transaction: Dict, feature_vector: np.ndarray) -> List[str]:
+    def _risk_level(self, overall_score: float) -> str:
+        """Map an ensemble score to a risk level"""
+        if overall_score >= self.THRESHOLDS['CRITICAL']:
+            return 'CRITICAL'
+        if overall_score >= self.THRESHOLDS['HIGH']:
+            return 'HIGH'
+        if overall_score >= self.THRESHOLDS['MEDIUM']:
+            return 'MEDIUM'
+        return 'LOW'
+    
+    def _calculate_risk_factors(self, transaction: Dict, feature_vector: np.ndarray,
+                                timestamp: datetime) -> List[str]:
         """Identify specific risk factors"""
-        risk_factors = []
-        
         amount = float(transaction.get('amount', 0))
-        
-        # High amount transactions
-        if amount > 10000:
-            risk_factors.append(f"High transaction amount: ${amount:,.2f}")
-        
-        # Unusual time
-        timestamp = transaction.get('timestamp', datetime.now().isoformat())
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        
-        if timestamp.hour < 6 or timestamp.hour > 22:
-            risk_factors.append(f"Unusual transaction time: {timestamp.hour}:00")
-        
-        # Weekend transaction
-        if timestamp.weekday() >= 5:
-            risk_factors.append("Weekend transaction")
-        
-        # Round number amounts (common in fraud)
-        if amount % 1000 == 0 and amount >= 1000:
-            risk_factors.append("Round number amount (potential test transaction)")
-        
-        # Velocity checks (placeholder)
         daily_count = transaction.get('daily_transaction_count', 0)
-        if daily_count > 10:
-            risk_factors.append(f"High transaction velocity: {daily_count} transactions today")
         
-        return risk_factors
+        # High amount, unusual time, weekend, round amount and velocity rules
+        mask = _rule_mask(amount, timestamp.hour, timestamp.weekday(), float(daily_count))
+        return _describe_rules(mask, amount, timestamp.hour, daily_count) if mask else []
+    
+    def _risk_factors_batch(self, transactions: List[Dict], timestamps: List[datetime]) -> List[List[str]]:
+        """Risk factors for a batch, evaluating the rules over whole arrays"""
+        count = len(transactions)
+        amounts = np.fromiter((float(txn.get('amount', 0)) for txn in transactions), dtype=np.float64, count=count)
+        daily_counts = [txn.get('daily_transaction_count', 0) for txn in transactions]
+        hours = np.fromiter((ts.hour for ts in timestamps), dtype=np.int64, count=count)
+        masks = _rule_mask_vec(
+            amounts,
+            hours,
+            np.fromiter((ts.weekday() for ts in timestamps), dtype=np.int64, count=count),
+            np.asarray(daily_counts, dtype=np.float64)
+        )
+        
+        # Strings only for transactions that triggered a rule
+        return [
+            _describe_rules(int(mask), amounts[i], hours[i], daily_counts[i]) if mask else []
+            for i, mask in enumerate(masks)
+        ]
     
     def detect_fraud(self, transaction: Dict) -> FraudScore:
         """
@@ -191,121 +609,261 @@ class FraudDetectionAgent:
         Returns:
             FraudScore object with detection results
         """
+        try:
+            timestamp = _validate_transaction(transaction)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Invalid transaction: {e}")
+            return self._error_score()
+        
         logger.info(f"Analyzing transaction: {transaction.get('transaction_id')}")
         
+        # Extract features
+        features = self._extract_features(transaction, timestamp)
+        
+        self._ensure_loaded()
+        
+        # Scale features with the training statistics; identity scaling until trained
+        scaler = self.scaler if self._fitted else _identity_scaler(features.shape[1])
         try:
-            # Extract features
-            features = self._extract_features(transaction)
-            
-            # Scale features
-            features_scaled = self.scaler.fit_transform(features)
-            
-            # Get anomaly scores from each model
-            anomaly_scores = {}
-            for model_name, model in self.models.items():
-                try:
-                    # Train on single sample (in production, would use historical data)
-                    model.fit(features_scaled)
-                    score = model.decision_function(features_scaled)[0]
-                    # Normalize to 0-1 range
-                    normalized_score = (score - model.decision_scores_.min()) / \
-                                     (model.decision_scores_.max() - model.decision_scores_.min() + 1e-10)
-                    anomaly_scores[model_name] = float(normalized_score)
-                except Exception as e:
-                    logger.warning(f"Model {model_name} failed: {e}")
-                    anomaly_scores[model_name] = 0.0
-            
-            # Ensemble scoring - weighted average
-            weights = {
-                'isolation_forest': 0.3,
-                'lof': 0.25,
-                'knn': 0.2,
-                'cblof': 0.15,
-                'hbos': 0.1
-            }
-            
-            overall_score = sum(
-                anomaly_scores.get(model, 0) * weight 
-                for model, weight in weights.items()
-            )
-            
-            # Determine risk level
-            if overall_score >= self.THRESHOLDS['CRITICAL']:
-                risk_level = 'CRITICAL'
-            elif overall_score >= self.THRESHOLDS['HIGH']:
-                risk_level = 'HIGH'
-            elif overall_score >= self.THRESHOLDS['MEDIUM']:
-                risk_level = 'MEDIUM'
-            else:
-                risk_level = 'LOW'
-            
-            # Identify risk factors
-            risk_factors = self._calculate_risk_factors(transaction, features)
-            
-            # Calculate confidence based on model agreement
-            scores = list(anomaly_scores.values())
-            confidence = 1.0 - (np.std(scores) if scores else 0.5)
-            
-            result = FraudScore(
-                overall_score=overall_score,
-                risk_level=risk_level,
-                anomaly_scores=anomaly_scores,
-                risk_factors=risk_factors,
-                confidence=confidence,
-                model_version=self.model_version
-            )
-            
-            logger.info(f"Fraud analysis complete: {risk_level} (score: {overall_score:.3f})")
-            return result
+            features_scaled = scaler.transform(features).astype(np.float32, copy=False)
+        except ValueError as e:
+            # A saved scaler trained on a different feature layout
+            logger.error(f"Feature scaling failed: {e}", exc_info=True)
+            return self._error_score()
+        
+        # Get anomaly scores from each pre-trained model, normalized to 0-1
+        # against the training score distribution; untrained or failed models
+        # give no anomaly signal and the rules still apply
+        raw_scores = self._raw_scores(features_scaled)
+        anomaly_scores = {
+            model_name: float(self._normalize_scores(model_name, raw_scores[model_name][0]))
+            if model_name in raw_scores else 0.0
+            for model_name in self._model_order
+        }
+        
+        # Ensemble scoring - weighted average; with no model scored there is
+        # no ensemble score and no confidence to claim
+        score_vec = np.fromiter(anomaly_scores.values(), dtype=np.float64, count=len(anomaly_scores))
+        overall_score = float(score_vec @ self._weight_vec) if raw_scores else 0.0
+        
+        # Determine risk level
+        risk_level = self._risk_level(overall_score)
+        
+        # Identify risk factors
+        risk_factors = self._calculate_risk_factors(transaction, features, timestamp)
+        
+        # Calculate confidence based on model agreement
+        confidence = 1.0 - float(score_vec.std()) if raw_scores else 0.0
+        
+        result = FraudScore(
+            overall_score=overall_score,
+            risk_level=risk_level,
+            anomaly_scores=anomaly_scores,
+            risk_factors=risk_factors,
+            confidence=confidence,
+            model_version=self.model_version
+        )
+        
+        logger.info(f"Fraud analysis complete: {risk_level} (score: {overall_score:.3f})")
+        return result
+    
+    def _error_score(self) -> FraudScore:
+        """Safe default for a transaction that could not be analyzed"""
+        return FraudScore(
+            overall_score=0.5,
+            risk_level='MEDIUM',
+            anomaly_scores={},
+            risk_factors=['Error during analysis'],
+            confidence=0.0,
+            model_version=self.model_version
+        )
+    
+    def batch_detect(self, transactions: List[Dict]) -> List[FraudScore]:
+        """
+        Batch process multiple transactions
+        
+        Features for the whole batch are scaled once and each model scores
+        the full matrix in a single decision_function call.
+        
+        Args:
+            transactions: List of transaction dictionaries
             
-        except Exception as e:
-            logger.error(f"Fraud detection error: {e}", exc_info=True)
-            # Return safe default on error
-            return FraudScore(
-                overall_score=0.5,
-                risk_level='MEDIUM',
-                anomaly_scores={},
-                risk_factors=['Error during analysis'],
-                confidence=0.0,
+        Returns:
+            FraudScore per transaction, in input order
+        """
+        if not transactions:
+            return []
+        
+        logger.info(f"Analyzing batch of {len(transactions)} transactions")
+        
+        # Invalid transactions get the safe default, the rest are scored together
+        results: List[FraudScore] = [None] * len(transactions)
+        valid, timestamps = [], []
+        for i, txn in enumerate(transactions):
+            try:
+                timestamps.append(_validate_transaction(txn))
+                valid.append(i)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Invalid transaction at position {i}: {e}")
+                results[i] = self._error_score()
+        if not valid:
+            return results
+        batch = [transactions[i] for i in valid]
+        
+        features = self._extract_features_batch(batch, timestamps)
+        
+        self._ensure_loaded()
+        
+        scaler = self.scaler if self._fitted else _identity_scaler(features.shape[1])
+        try:
+            features_scaled = scaler.transform(features).astype(np.float32, copy=False)
+        except ValueError as e:
+            logger.error(f"Feature scaling failed: {e}", exc_info=True)
+            for i in valid:
+                results[i] = self._error_score()
+            return results
+        
+        # (N, models) matrix of normalized anomaly scores
+        scores = np.zeros((len(batch), len(self._model_order)))
+        raw_scores = self._raw_scores(features_scaled)
+        for j, model_name in enumerate(self._model_order):
+            if model_name in raw_scores:
+                scores[:, j] = self._normalize_scores(model_name, raw_scores[model_name])
+        
+        if raw_scores:
+            overall_scores = scores @ self._weight_vec
+            confidences = 1.0 - scores.std(axis=1)
+        else:
+            # No model scored - no ensemble score and no confidence to claim
+            overall_scores = confidences = np.zeros(len(batch))
+        risk_factors = self._risk_factors_batch(batch, timestamps)
+        
+        for row, i in enumerate(valid):
+            results[i] = FraudScore(
+                overall_score=float(overall_scores[row]),
+                risk_level=self._risk_level(overall_scores[row]),
+                anomaly_scores=dict(zip(self._model_order, scores[row].tolist())),
+                risk_factors=risk_factors[row],
+                confidence=float(confidences[row]),
                 model_version=self.model_version
             )
-    
-    def batch_detect(self, transactions: List[Dict]) -> List[FraudScore]:
-        """Batch process multiple transactions"""
-        return [self.detect_fraud(txn) for txn in transactions]
+        return results
     
     def train_models(self, historical_data: pd.DataFrame, labels: np.ndarray = None):
         """
         Train models on historical transaction data
         
         Args:
-            historical_data: DataFrame with transaction features
+            historical_data: DataFrame of raw transactions, or of extracted features
             labels: Optional fraud labels (1=fraud, 0=legitimate)
         """
         logger.info(f"Training models on {len(historical_data)} transactions")
         
+        # Raw transactions: learn categorical encodings, then extract features
+        categorical = [column for column in self.CATEGORICAL_FEATURES if column in historical_data.columns]
+        if categorical:
+            self._cat_maps = {
+                column: {
+                    value: code
+                    for code, value in enumerate(dict.fromkeys(map(_category_value, historical_data[column].unique())), start=1)
+                }
+                for column in categorical
+            }
+            self._specialize_features()
+            records = historical_data.to_dict('records')
+            timestamps = [_parse_ts(record.get('timestamp')) for record in records]
+            historical_data = self._extract_features_batch(records, timestamps)
+        
         # Scale features
-        features_scaled = self.scaler.fit_transform(historical_data)
+        features_scaled = self.scaler.fit_transform(np.asarray(historical_data, dtype=np.float32))
+        _float32_scaler(self.scaler)
+        self._fitted = True
         
         # Train each model
         for model_name, model in self.models.items():
             logger.info(f"Training {model_name}")
             model.fit(features_scaled)
+            scores = model.decision_scores_
+            # Training scores are shared by every request - guard them against writes
+            scores.setflags(write=False)
+            self._score_mu[model_name] = float(scores.mean())
+            self._score_sigma[model_name] = float(scores.std()) or 1.0
+        
+        if all(model_name in self.models for model_name in self.NEIGHBOR_MODELS):
+            try:
+                self._neighbor_index = self._build_neighbor_index(features_scaled)
+            except ImportError:
+                self._neighbor_index = None
+                logger.warning("faiss not available, KNN/LOF will use exact neighbor search")
+        
+        if labels is not None:
+            # Weight each detector by how much its training scores tell about the labels
+            training_scores = np.column_stack([self.models[name].decision_scores_ for name in self._model_order])
+            mutual_info = mutual_info_classif(training_scores, labels, random_state=42)
+            if mutual_info.sum() > 0:
+                self._weight_vec = mutual_info / mutual_info.sum()
+            else:
+                logger.warning("Model scores carry no label information, keeping default weights")
         
         # Save models
         self.save_models()
         logger.info("Model training complete")
     
+    def _write_artifact(self, path: str, write: Callable[[str], None]):
+        """
+        Write an artifact to a temporary file, then rename it over path
+        
+        Loaded artifacts are memory-mapped from these files; truncating one in
+        place would make its mapped arrays fault (SIGBUS) when read while the
+        new copy is written. A rename leaves the mapped inode intact.
+        """
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _dump_artifact(self, obj, name: str):
+        """joblib-dump an artifact atomically"""
+        self._write_artifact(f"{self.model_dir}/{name}.joblib", lambda path: joblib.dump(obj, path))
+    
     def save_models(self):
-        """Save trained models to disk"""
+        """
+        Save trained models to disk
+        
+        Artifacts are written uncompressed with joblib so their numpy arrays
+        can be memory-mapped on load.
+        """
         os.makedirs(self.model_dir, exist_ok=True)
         
-        with open(f"{self.model_dir}/scaler.pkl", 'wb') as f:
-            pickle.dump(self.scaler, f)
+        # An unfitted scaler on disk would be loaded as fitted
+        if self._fitted:
+            self._dump_artifact(self.scaler, 'scaler')
         
         for model_name, model in self.models.items():
-            with open(f"{self.model_dir}/{model_name}.pkl", 'wb') as f:
-                pickle.dump(model, f)
+            self._dump_artifact(model, model_name)
+        
+        if self._cat_maps:
+            self._dump_artifact(self._cat_maps, 'category_maps')
+        
+        # Only trained models have score statistics; saving them marks the models as usable
+        if self._score_mu:
+            score_stats = {
+                'mu': self._score_mu,
+                'sigma': self._score_sigma,
+                'weights': dict(zip(self._model_order, self._weight_vec.tolist()))
+            }
+            index_path = f"{self.model_dir}/neighbor_index.faiss"
+            if self._neighbor_index is not None:
+                import faiss
+                self._write_artifact(index_path, lambda path: faiss.write_index(self._neighbor_index, path))
+            elif os.path.exists(index_path):
+                # An index from an earlier training run no longer matches the models
+                os.remove(index_path)
+            self._dump_artifact(score_stats, 'score_stats')
         
         logger.info(f"Models saved to {self.model_dir}")
     
@@ -321,12 +879,16 @@ class FraudDetectionAgent:
 
 # Global agent instance
 _fraud_agent = None
+_fraud_agent_lock = threading.Lock()
 
 def get_fraud_agent() -> FraudDetectionAgent:
     """Get or create global fraud detection agent"""
     global _fraud_agent
     if _fraud_agent is None:
-        _fraud_agent = FraudDetectionAgent()
+        # Double-checked so concurrent first requests build a single agent
+        with _fraud_agent_lock:
+            if _fraud_agent is None:
+                _fraud_agent = FraudDetectionAgent()
     return _fraud_agent
 
 
@@ -128,21 +128,48 @@ async def check_compliance(transaction: Transaction):
         agent = get_compliance_agent()
         result = agent.check_compliance(transaction.model_dump())
         
+        return _compliance_response(transaction.transaction_id, result)
+    except Exception as e:
+        logger.error(f"Compliance check error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Batch compliance check endpoint
+@app.post("/api/v1/compliance-check/batch", response_model=Dict)
+async def check_compliance_batch(request: BatchTransactionRequest):
+    """
+    Check compliance for multiple transactions with one batched policy retrieval
+    """
+    try:
+        agent = get_compliance_agent()
+        results = agent.batch_check([transaction.model_dump() for transaction in request.transactions])
+        
         return {
-            "transaction_id": transaction.transaction_id,
-            "status": result.status,
-            "sanctions_hit": result.sanctions_hit,
-            "pep_hit": result.pep_hit,
-            "risk_score": result.risk_score,
-            "policy_violations": result.policy_violations,
-            "recommendations": result.recommendations,
-            "timestamp": result.timestamp
+            "checked_count": len(results),
+            "results": [
+                _compliance_response(transaction.transaction_id, result)
+                for transaction, result in zip(request.transactions, results)
+            ],
+            "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
-        logger.error(f"Compliance check error: {e}", exc_info=True)
+        logger.error(f"Batch compliance check error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _compliance_response(transaction_id: str, result) -> Dict:
+    return {
+        "transaction_id": transaction_id,
+        "status": result.status,
+        "sanctions_hit": result.sanctions_hit,
+        "pep_hit": result.pep_hit,
+        "risk_score": result.risk_score,
+        "policy_violations": result.policy_violations,
+        "recommendations": result.recommendations,
+        "timestamp": result.timestamp
+    }
+
+
 # Document upload endpoint
 @app.post("/api/v1/upload-document")
 async def upload_document(file: UploadFile = File(...)):
@@ -3,17 +3,41 @@ Comprehensive Test Suite
 Tests all agents and orchestration
 """
 
+import asyncio
 import pytest
 import sys
+from datetime import datetime
 from pathlib import Path
 
+import cv2
+import numpy as np
+import pandas as pd
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from agents.fraud_detection.agent import FraudDetectionAgent
 from agents.compliance.agent import ComplianceAgent
-from agents.document_processing.agent import DocumentProcessingAgent
+from agents.document_processing.agent import (
+    _FIELD_PATTERNS, _FUSED_FIELDS, TESSERACT_AVAILABLE, DocumentProcessingAgent, _first_group
+)
 from agents.spend_analysis.agent import SpendAnalysisAgent
+from agents.explanation.agent import Explanation, ExplanationGeneratorAgent
+
+
+def _mock_transactions(count: int, seed: int = 0) -> pd.DataFrame:
+    """Raw transactions shaped like scripts/init_db.py's mock data"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.datetime64('2025-01-01T00:00') + rng.integers(0, 365 * 24 * 60, size=count).astype('timedelta64[m]')
+    return pd.DataFrame({
+        'transaction_id': [f'TXN-{seed}-{i}' for i in range(count)],
+        'amount': rng.lognormal(6, 1.5, size=count).round(2),
+        'merchant': rng.choice(['Vendor A', 'Vendor B', 'Vendor C', 'Hotel Chain'], size=count),
+        'category': rng.choice(['Travel', 'IT Services', 'Entertainment', 'Supplies'], size=count),
+        'user_id': [f'EMP-{n:03d}' for n in rng.integers(1, 50, size=count)],
+        'timestamp': np.datetime_as_string(timestamps),
+        'location': rng.choice(['New York', 'Chicago', 'Remote'], size=count)
+    })
 
 
 class TestFraudDetectionAgent:
@@ -75,6 +99,81 @@ class TestFraudDetectionAgent:
         results = agent.batch_detect(transactions)
         assert len(results) == 5
         assert all(r.overall_score >= 0 for r in results)
+    
+    def test_non_string_categorical_values(self, tmp_path):
+        """Test int and NaN categorical values from DataFrame records are encoded by their string form"""
+        history = _mock_transactions(300)
+        history['user_id'] = history['user_id'].str[4:].astype(int)
+        history.loc[::10, 'location'] = np.nan
+        
+        agent = FraudDetectionAgent(model_dir=str(tmp_path))
+        agent.train_models(history)
+        assert all(isinstance(value, str) for value in agent._cat_maps['user_id'])
+        assert 'unknown' in agent._cat_maps['location']
+        
+        record = history.to_dict('records')[0]
+        as_strings = dict(record, user_id=str(record['user_id']), location='unknown')
+        record['location'] = float('nan')
+        
+        result = agent.detect_fraud(record)
+        expected = agent.detect_fraud(as_strings)
+        assert result.overall_score == pytest.approx(expected.overall_score)
+        
+        from agents.fraud_detection.agent import _validate_transaction
+        with pytest.raises(TypeError, match="merchant"):
+            _validate_transaction(dict(record, merchant=['Vendor A']))
+    
+    def test_neighbor_index_matches_pyod_scores(self, tmp_path):
+        """Test KNN/LOF scores from the FAISS index match PyOD's decision_function"""
+        pytest.importorskip("faiss")
+        agent = FraudDetectionAgent(model_dir=str(tmp_path))
+        agent.train_models(_mock_transactions(300))
+        assert agent._neighbor_index is not None
+        
+        held_out = _mock_transactions(40, seed=1).to_dict('records')
+        timestamps = [datetime.fromisoformat(txn['timestamp']) for txn in held_out]
+        features = agent.scaler.transform(agent._extract_features_batch(held_out, timestamps))
+        
+        neighbor_scores = agent._neighbor_scores(features)
+        for model_name in ('knn', 'lof'):
+            expected = agent.models[model_name].decision_function(features)
+            assert np.allclose(neighbor_scores[model_name], expected, rtol=1e-4, atol=1e-5)
+    
+    def test_trained_models_round_trip(self, tmp_path):
+        """Test models trained, saved and reloaded score transactions identically"""
+        history = _mock_transactions(300)
+        labels = (history['amount'] > history['amount'].quantile(0.95)).astype(int).to_numpy()
+        
+        trained = FraudDetectionAgent(model_dir=str(tmp_path))
+        trained.train_models(history, labels)
+        loaded = FraudDetectionAgent(model_dir=str(tmp_path))
+        
+        # Score statistics, learned weights and categorical codes survive the round trip
+        assert loaded._score_mu == trained._score_mu
+        assert np.allclose(loaded._weight_vec, trained._weight_vec)
+        assert np.isclose(loaded._weight_vec.sum(), 1.0)
+        assert loaded._cat_maps == trained._cat_maps
+        assert loaded._encode_category('category', 'Travel') > 0
+        assert loaded._encode_category('category', 'never seen') == 0
+        
+        transaction = {
+            "transaction_id": "TEST-RT",
+            "amount": 25000.00,
+            "merchant": "Vendor A",
+            "category": "Travel",
+            "user_id": "EMP-001",
+            "timestamp": "2025-01-15T02:30:00Z",
+            "location": "Remote"
+        }
+        expected = trained.detect_fraud(transaction)
+        result = loaded.detect_fraud(transaction)
+        
+        assert set(result.anomaly_scores) == set(loaded.models)
+        assert 0 <= result.overall_score <= 1
+        assert 0 < result.confidence <= 1
+        assert result.overall_score == pytest.approx(expected.overall_score, abs=1e-6)
+        assert result.anomaly_scores == pytest.approx(expected.anomaly_scores, abs=1e-6)
+        assert result.risk_level == expected.risk_level
 
 
 class TestComplianceAgent:
@@ -162,17 +261,73 @@ class TestDocumentProcessingAgent:
     
     def test_field_extraction(self):
         """Test field extraction from text"""
-        agent = DocumentProcessingAgent()
-        
         text = "Total: $52.92\nTax: $3.92\nDate: 01/15/2025"
         
-        total = agent._extract_field(text, 'total')
-        tax = agent._extract_field(text, 'tax')
-        date = agent._extract_field(text, 'date')
+        fields = DocumentProcessingAgent()._extract_fields(text)
         
-        assert total is not None
-        assert tax is not None
-        assert date is not None
+        assert fields['total'] == "52.92"
+        assert fields['tax'] == "3.92"
+        assert fields['date'] == "01/15/2025"
+    
+    def test_batch_process_in_worker_processes(self):
+        """Test pooled batch processing keeps input order and processes repeated documents once"""
+        agent = DocumentProcessingAgent()
+        if agent._tess is None and TESSERACT_AVAILABLE:
+            pytest.skip("batch goes through the Tesseract file-list path")
+
+        images = [
+            cv2.imencode('.png', np.full((40, width), 255, np.uint8))[1].tobytes()
+            for width in (40, 60)
+        ]
+        documents = [{'image_bytes': images[0]}, {'image_bytes': images[1]}, {'image_bytes': images[0]}]
+
+        results = agent.batch_process(documents, max_workers=2)
+
+        assert [r.metadata['image_size'] for r in results] == ['40x40', '60x40', '40x40']
+        assert results[0] is not results[2]
+        assert results[0].items is not results[2].items
+
+    def test_fused_field_extraction_matches_patterns(self):
+        """Test the single fused scan picks the same match as trying each field's patterns in order"""
+        agent = DocumentProcessingAgent()
+        texts = [
+            agent._generate_mock_receipt_text(),
+            "INVOICE\nVAT: 4,20\nGrand Total 61,80\nSales tax 1.10\nIssued Mar 3, 2025 and 2025-03-04",
+            "Amount $9.99 Tax: $0.80 Total: $10.79",
+            "no fields here",
+        ]
+        
+        for text in texts:
+            fields = agent._extract_fields(text)
+            for field in _FUSED_FIELDS:
+                assert fields[field] == _first_group(_FIELD_PATTERNS[field], text)
+
+    def test_result_cache_skips_ocr_fallback(self, monkeypatch):
+        """Mock text after an OCR error is retried; real results are cached and returned as copies"""
+        from agents.document_processing.agent import OcrResult
+
+        agent = DocumentProcessingAgent()
+        image_bytes = cv2.imencode('.png', np.full((40, 40), 255, np.uint8))[1].tobytes()
+        text = agent._generate_mock_receipt_text()
+        calls = []
+
+        def fake_ocr(gray):
+            calls.append(gray)
+            return OcrResult(text, None if len(calls) == 1 else 0.9, None)
+
+        monkeypatch.setattr(agent, '_extract_text_from_image', fake_ocr)
+
+        agent.process_document({'image_bytes': image_bytes})
+        first = agent.process_document({'image_bytes': image_bytes})
+        assert len(calls) == 2
+        assert first.confidence_score == 0.9
+
+        first.items.clear()
+        first.metadata['processing_timestamp'] = 'stale'
+        second = agent.process_document({'image_bytes': image_bytes})
+        assert len(calls) == 2
+        assert second.items and second.items is not first.items
+        assert second.metadata['processing_timestamp'] != 'stale'
 
 
 class TestSpendAnalysisAgent:
@@ -250,6 +405,65 @@ class TestSpendAnalysisAgent:
         assert len(result.risk_areas) > 0
 
 
+class TestExplanationGeneratorAgent:
+    """Test explanation generator agent"""
+    
+    def test_batch_returns_per_job_exceptions(self):
+        """Test an unknown job kind fails only that job in a mixed batch"""
+        agent = ExplanationGeneratorAgent()
+        
+        results = asyncio.run(agent.aexplain_batch([
+            ('spend', {}),
+            ('unknown', {}),
+            ('vendor', {'vendor_name': 'Tech Vendor'}),
+        ]))
+        
+        assert len(results) == 3
+        assert isinstance(results[0], Explanation)
+        assert isinstance(results[1], KeyError)
+        assert isinstance(results[2], Explanation)
+    
+    def test_llm_resources_per_event_loop(self):
+        """Test the LLM semaphore is recreated for each asyncio.run on the singleton agent"""
+        agent = ExplanationGeneratorAgent()
+        
+        class FakeLLM:
+            async def acomplete(self, prompt, system=None):
+                return "LLM explanation"
+        
+        agent._llm = FakeLLM()
+        
+        async def explain():
+            explanation = await agent.aexplain_spend_analysis({})
+            return explanation, agent._llm_sems.get()
+        
+        first, first_sem = asyncio.run(explain())
+        second, second_sem = asyncio.run(explain())
+        
+        assert first.detailed_explanation == second.detailed_explanation == "LLM explanation"
+        assert first_sem is not second_sem
+    
+    def test_llm_client_pool_per_event_loop(self, monkeypatch):
+        """Test each event loop gets its own HTTP connection pool, closed by aclose"""
+        pytest.importorskip("openai")
+        from agents.explanation.agent import LLMClient
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        client = LLMClient('openai')
+        
+        async def pool():
+            http = client._clients.get()[0]
+            assert client._client is client._client
+            await client.aclose()
+            return http
+        
+        first = asyncio.run(pool())
+        second = asyncio.run(pool())
+        
+        assert first is not second
+        assert first.is_closed and second.is_closed
+
+
 class TestIntegration:
     """Integration tests for full pipeline"""
     